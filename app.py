@@ -1,42 +1,301 @@
 import streamlit as st
-import streamlit_ace
+import hashlib
 import os
 import threading
 import time
-from services.ai_service import AIService
-from services.code_executor import CodeExecutor
-from services.language_handler import LanguageHandler
-from services.code_analyzer import CodeAnalyzer
-from services.inline_completion import InlineCompletionService
-from services.smart_completion import SmartCodeCompletion
-from config.languages import SUPPORTED_LANGUAGES
+from services.bg import get_background_executor, harvest_future
+from config.languages import SUPPORTED_LANGUAGES, SUPPORTED_LANGUAGE_KEYS, SUPPORTED_LANGUAGE_INDEX
 from utils.formatters import format_code
 
-# Initialize services
+@st.cache_data(max_entries=64, ttl=600, show_spinner=False)
+def _cached_format(code: str, language: str):
+    """Skip re-running autopep8/prettier when the buffer hasn't changed"""
+    return format_code(code, language)
+
+@st.cache_data(max_entries=128, ttl=300, show_spinner=False)
+def _cached_analyze(code: str, language: str):
+    """Memoize full analysis results keyed on buffer content"""
+    return get_code_analyzer().analyze_code(code, language)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _search_snippets(query: str):
+    """Snippet library lookups are static per query - memoize them"""
+    return get_smart_completion().get_all_suggestions(query)[:8]
+
+def _group_by_type(suggestions):
+    """Group suggestions by their type for the category display"""
+    grouped = {}
+    for suggestion in suggestions:
+        grouped.setdefault(suggestion.type, []).append(suggestion)
+    return grouped
+
+# Initialize services - imports happen inside the factories so jedi,
+# autopep8 and friends are resolved on first use, not at app startup
 @st.cache_resource
 def get_ai_service():
+    from services.ai_service import AIService
     return AIService()
 
 @st.cache_resource
 def get_code_executor():
+    from services.code_executor import CodeExecutor
     return CodeExecutor()
 
 @st.cache_resource
 def get_language_handler():
+    from services.language_handler import LanguageHandler
     return LanguageHandler()
 
 @st.cache_resource
 def get_code_analyzer():
+    from services.code_analyzer import CodeAnalyzer
     return CodeAnalyzer()
 
 @st.cache_resource
 def get_inline_completion():
+    from services.inline_completion import InlineCompletionService
     return InlineCompletionService()
 
 @st.cache_resource
 def get_smart_completion():
+    from services.smart_completion import SmartCodeCompletion
     return SmartCodeCompletion()
 
+_SESSION_DEFAULTS = {
+    'language': "python",
+    'output': "",
+    'suggestions': [],
+    'analysis': {},
+    'inline_suggestion': None,
+    'show_snippet_suggestions': False,
+}
+
+def _init_session_state():
+    """Populate session state defaults for keys not yet set"""
+    if 'code' not in st.session_state:
+        st.session_state.code = SUPPORTED_LANGUAGES["python"]["sample_code"]
+    for key, default in _SESSION_DEFAULTS.items():
+        if key not in st.session_state:
+            # Copy containers so sessions never share a mutable default
+            st.session_state[key] = default.copy() if isinstance(default, (list, dict)) else default
+
+def _on_code_change(code_content, executor, ai_service, inline_completion,
+                    smart_completion, enable_suggestions, enable_inline, enable_analysis):
+    """Run the prediction/analysis pipeline for changed editor content"""
+    # Skip entirely when the content digest matches what was last analyzed -
+    # catches an undo back to already-analyzed code, which the caller's
+    # != check misses
+    content_hash = hashlib.blake2b(code_content.encode(), digest_size=8).digest()
+    if content_hash == st.session_state.get('last_content_hash'):
+        return
+    st.session_state.last_content_hash = content_hash
+
+    # Predict only once the typing burst pauses (or after a large paste)
+    # instead of on each of the 5-10 reruns a burst generates per second
+    now = time.monotonic()
+    last_edit = st.session_state.get('last_edit_ts', 0.0)
+    st.session_state.last_edit_ts = now
+    idle = now - last_edit > 0.25
+    big_change = abs(len(code_content) - st.session_state.get('last_analyzed_len', 0)) > 40
+
+    # Get smart inline completion (AI-powered)
+    if enable_inline and st.session_state.language == "python":
+        if idle or big_change:
+            st.session_state.last_analyzed_len = len(code_content)
+            smart_suggestion = smart_completion.analyze_and_predict(code_content)
+            st.session_state.smart_suggestion = smart_suggestion
+
+            # Also get basic inline suggestion as fallback
+            inline_suggestion = inline_completion.get_inline_completion(code_content)
+            st.session_state.inline_suggestion = inline_suggestion
+    else:
+        st.session_state.smart_suggestion = None
+        st.session_state.inline_suggestion = None
+
+    # Queue AI suggestions and analysis off the keystroke path; stale
+    # results stay on screen until the workers finish. Debounce so a
+    # typing burst submits once instead of per keystroke.
+    if code_content.strip() and now - st.session_state.get('last_submit', 0.0) > 0.3:
+        if enable_suggestions:
+            st.session_state.suggestions_future = executor.submit(
+                ai_service.get_suggestions,
+                code_content,
+                st.session_state.language,
+                "local"
+            )
+        if enable_analysis:
+            st.session_state.analysis_future = executor.submit(
+                _cached_analyze,
+                code_content,
+                st.session_state.language
+            )
+        st.session_state.last_submit = now
+
+@st.fragment
+def editor_fragment(ai_service, inline_completion, smart_completion,
+                    enable_suggestions, enable_inline, enable_analysis):
+    """Editor, completions and AI suggestions - reruns in isolation on keystrokes"""
+    import streamlit_ace
+
+    lang_cfg = SUPPORTED_LANGUAGES[st.session_state.language]
+    executor = get_background_executor()
+
+    # Collect any analysis that finished since the last rerun
+    harvest_future('suggestions_future', 'suggestions')
+    harvest_future('analysis_future', 'analysis')
+
+    # Regroup only when the suggestion list itself was replaced
+    if st.session_state.get('suggestions_grouped_for') is not st.session_state.suggestions:
+        st.session_state.suggestions_grouped = _group_by_type(st.session_state.suggestions)
+        st.session_state.suggestions_grouped_for = st.session_state.suggestions
+
+    # Smart inline suggestion (appears above editor like Google Colab)
+    if enable_inline and st.session_state.get('smart_suggestion'):
+        suggestion = st.session_state.smart_suggestion
+        confidence = suggestion.get('confidence', 0) * 100
+
+        # Display inline suggestion with prominent styling
+        st.markdown("---")
+        col_desc, col_conf, col_accept, col_reject = st.columns([3, 1, 1, 1])
+
+        with col_desc:
+            st.markdown(f"**✨ {suggestion.get('description', 'Code suggestion')}**")
+        with col_conf:
+            st.caption(f"🎯 {confidence:.0f}%")
+        with col_accept:
+            if st.button("✓ Accept", key="accept_smart", type="primary", use_container_width=True):
+                st.session_state.code = suggestion['completion']
+                st.session_state.smart_suggestion = None
+                st.rerun(scope="fragment")
+        with col_reject:
+            if st.button("✕ Dismiss", key="reject_smart", use_container_width=True):
+                st.session_state.smart_suggestion = None
+                st.rerun(scope="fragment")
+
+        # Show suggestion in code block (inline preview)
+        with st.container():
+            st.code(suggestion['completion'], language=st.session_state.language, line_numbers=True)
+
+        st.caption("💡 Tip: Click 'Dismiss' to reject and continue typing your own code")
+        st.markdown("---")
+
+    # Code editor
+    code_content = streamlit_ace.st_ace(
+        value=st.session_state.code,
+        language=lang_cfg['ace_mode'],
+        theme='github',
+        key='code_editor',
+        height=400,
+        # Batch edits client-side; the buffer syncs on blur / Ctrl+Enter
+        # instead of forcing a backend rerun per keystroke
+        auto_update=False,
+        font_size=14,
+        tab_size=4,
+        wrap=True,
+        markers=None,
+        show_gutter=True,
+        show_print_margin=True
+    )
+    st.caption("⌨️ Press Ctrl+Enter (or click outside the editor) to apply changes and refresh suggestions")
+
+    # Update session state if code changed
+    if code_content != st.session_state.code:
+        st.session_state.code = code_content
+        _on_code_change(code_content, executor, ai_service, inline_completion,
+                        smart_completion, enable_suggestions, enable_inline, enable_analysis)
+
+
+    # Quick snippet suggestions (inline style)
+    if enable_inline:
+        with st.expander("📚 Smart Code Snippets Library", expanded=False):
+            st.caption("🔍 Search and insert complete code patterns")
+
+            snippet_search = st.text_input(
+                "Type to search (prime, palindrome, sort, fibonacci, etc.)",
+                key="snippet_search",
+                placeholder="Start typing..."
+            )
+
+            # Get smart suggestions, capped once instead of re-sliced per rerun
+            snippets = _search_snippets(snippet_search or "")
+
+            if snippets:
+                st.caption(f"📊 Found {len(snippets)} matching patterns")
+                for idx, snippet in enumerate(snippets):
+                    col_name, col_btn = st.columns([4, 1])
+                    with col_name:
+                        st.markdown(f"**{snippet['name']}**")
+                        st.caption(snippet.get('description', ''))
+                    with col_btn:
+                        if st.button("Insert", key=f"snippet_{idx}", use_container_width=True):
+                            st.session_state.code = snippet['code']
+                            st.session_state.smart_suggestion = None
+                            st.rerun(scope="fragment")
+
+                    # Show preview
+                    with st.expander(f"Preview: {snippet['name']}", expanded=False):
+                        st.code(snippet['code'][:200] + "..." if len(snippet['code']) > 200 else snippet['code'],
+                               language="python")
+
+                    if idx < len(snippets) - 1:
+                        st.markdown("---")
+
+    # AI Suggestions panel
+    if enable_suggestions and st.session_state.suggestions:
+        st.subheader("💡 AI Suggestions")
+
+        # Display by category with icons
+        type_icons = {
+            'algorithm': '⚙️',
+            'data_structure': '📊',
+            'ml_algorithm': '🤖',
+            'optimization': '⚡',
+            'snippet': '📝',
+            'completion': '✨',
+            'general': '💡'
+        }
+
+        for stype, suggestions in st.session_state.suggestions_grouped.items():
+            icon = type_icons.get(stype, '💡')
+            st.markdown(f"### {icon} {stype.replace('_', ' ').title()}")
+
+            for i, suggestion in enumerate(suggestions[:3]):
+                with st.expander(suggestion.title):
+                    st.write(suggestion.description)
+
+                    if suggestion.category:
+                        st.caption(f"📂 {suggestion.category.replace('_', ' ').title()}")
+
+                    if suggestion.code:
+                        st.code(suggestion.code, language=st.session_state.language)
+                        unique_key = f"apply_{stype}_{i}"
+                        if st.button(f"Apply This", key=unique_key, use_container_width=True):
+                            st.session_state.code = suggestion.code
+                            st.success(f"✅ Applied: {suggestion.title}")
+                            st.rerun(scope="fragment")
+
+@st.fragment(run_every=1.0)
+def output_panel():
+    """Console output - polls the background run until it completes"""
+    run_future = st.session_state.get('run_future')
+    if run_future is not None:
+        if run_future.done():
+            st.session_state.output = run_future.result()
+            st.session_state.run_future = None
+        else:
+            st.caption("⏳ Executing code...")
+
+    if st.session_state.output:
+        st.text_area(
+            "Output",
+            value=st.session_state.output,
+            height=300,
+            disabled=True,
+            key="console_output"
+        )
+    else:
+        st.info("Run code to see output here")
+
 def main():
     st.set_page_config(
         page_title="AI Code Editor",
@@ -45,27 +304,12 @@ def main():
         initial_sidebar_state="expanded"
     )
     
-    # Initialize session state
-    if 'code' not in st.session_state:
-        st.session_state.code = SUPPORTED_LANGUAGES["python"]["sample_code"]
-    if 'language' not in st.session_state:
-        st.session_state.language = "python"
-    if 'output' not in st.session_state:
-        st.session_state.output = ""
-    if 'suggestions' not in st.session_state:
-        st.session_state.suggestions = []
-    if 'analysis' not in st.session_state:
-        st.session_state.analysis = {}
-    if 'inline_suggestion' not in st.session_state:
-        st.session_state.inline_suggestion = None
-    if 'show_snippet_suggestions' not in st.session_state:
-        st.session_state.show_snippet_suggestions = False
-    
+    _init_session_state()
+
     # Get services
     ai_service = get_ai_service()
     code_executor = get_code_executor()
     language_handler = get_language_handler()
-    code_analyzer = get_code_analyzer()
     inline_completion = get_inline_completion()
     smart_completion = get_smart_completion()
     
@@ -76,8 +320,8 @@ def main():
         # Language selection
         selected_language = st.selectbox(
             "Programming Language",
-            options=list(SUPPORTED_LANGUAGES.keys()),
-            index=list(SUPPORTED_LANGUAGES.keys()).index(st.session_state.language),
+            options=SUPPORTED_LANGUAGE_KEYS,
+            index=SUPPORTED_LANGUAGE_INDEX[st.session_state.language],
             key="lang_select"
         )
         
@@ -96,7 +340,7 @@ def main():
         # Code formatting
         st.subheader("📝 Formatting")
         if st.button("Format Code", use_container_width=True):
-            formatted_code = format_code(st.session_state.code, st.session_state.language)
+            formatted_code = _cached_format(st.session_state.code, st.session_state.language)
             if formatted_code:
                 st.session_state.code = formatted_code
                 st.rerun()
@@ -108,203 +352,37 @@ def main():
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.subheader(f"📝 Editor ({SUPPORTED_LANGUAGES[st.session_state.language]['name']})")
-        
-        # Smart inline suggestion (appears above editor like Google Colab)
-        if enable_inline and st.session_state.get('smart_suggestion'):
-            suggestion = st.session_state.smart_suggestion
-            confidence = suggestion.get('confidence', 0) * 100
-            
-            # Display inline suggestion with prominent styling
-            st.markdown("---")
-            col_desc, col_conf, col_accept, col_reject = st.columns([3, 1, 1, 1])
-            
-            with col_desc:
-                st.markdown(f"**✨ {suggestion.get('description', 'Code suggestion')}**")
-            with col_conf:
-                st.caption(f"🎯 {confidence:.0f}%")
-            with col_accept:
-                if st.button("✓ Accept", key="accept_smart", type="primary", use_container_width=True):
-                    st.session_state.code = suggestion['completion']
-                    st.session_state.smart_suggestion = None
-                    st.rerun()
-            with col_reject:
-                if st.button("✕ Dismiss", key="reject_smart", use_container_width=True):
-                    st.session_state.smart_suggestion = None
-                    st.rerun()
-            
-            # Show suggestion in code block (inline preview)
-            with st.container():
-                st.code(suggestion['completion'], language=st.session_state.language, line_numbers=True)
-            
-            st.caption("💡 Tip: Click 'Dismiss' to reject and continue typing your own code")
-            st.markdown("---")
-        
-        # Code editor
-        code_content = streamlit_ace.st_ace(
-            value=st.session_state.code,
-            language=SUPPORTED_LANGUAGES[st.session_state.language]['ace_mode'],
-            theme='github',
-            key='code_editor',
-            height=400,
-            auto_update=True,
-            font_size=14,
-            tab_size=4,
-            wrap=True,
-            markers=None,
-            show_gutter=True,
-            show_print_margin=True
-        )
-        
-        # Update session state if code changed
-        if code_content != st.session_state.code:
-            st.session_state.code = code_content
-            
-            # Get smart inline completion (AI-powered)
-            if enable_inline and st.session_state.language == "python":
-                smart_suggestion = smart_completion.analyze_and_predict(code_content)
-                st.session_state.smart_suggestion = smart_suggestion
-                
-                # Also get basic inline suggestion as fallback
-                inline_suggestion = inline_completion.get_inline_completion(code_content)
-                st.session_state.inline_suggestion = inline_suggestion
-            else:
-                st.session_state.smart_suggestion = None
-                st.session_state.inline_suggestion = None
-            
-            # Get AI suggestions in background
-            if enable_suggestions and code_content.strip():
-                with st.spinner("Analyzing code..."):
-                    suggestions = ai_service.get_suggestions(
-                        code_content, 
-                        st.session_state.language,
-                        "local"
-                    )
-                    st.session_state.suggestions = suggestions
-            
-            # Analyze code if enabled
-            if enable_analysis and code_content.strip():
-                analysis = code_analyzer.analyze_code(
-                    code_content, 
-                    st.session_state.language
-                )
-                st.session_state.analysis = analysis
-        
-        
-        # Quick snippet suggestions (inline style)
-        if enable_inline:
-            with st.expander("📚 Smart Code Snippets Library", expanded=False):
-                st.caption("🔍 Search and insert complete code patterns")
-                
-                snippet_search = st.text_input(
-                    "Type to search (prime, palindrome, sort, fibonacci, etc.)", 
-                    key="snippet_search",
-                    placeholder="Start typing..."
-                )
-                
-                # Get smart suggestions
-                if snippet_search:
-                    snippets = smart_completion.get_all_suggestions(snippet_search)
-                else:
-                    snippets = smart_completion.get_all_suggestions("")
-                
-                if snippets:
-                    st.caption(f"📊 Found {len(snippets)} matching patterns")
-                    for idx, snippet in enumerate(snippets[:8]):
-                        col_name, col_btn = st.columns([4, 1])
-                        with col_name:
-                            st.markdown(f"**{snippet['name']}**")
-                            st.caption(snippet.get('description', ''))
-                        with col_btn:
-                            if st.button("Insert", key=f"snippet_{idx}", use_container_width=True):
-                                st.session_state.code = snippet['code']
-                                st.session_state.smart_suggestion = None
-                                st.rerun()
-                        
-                        # Show preview
-                        with st.expander(f"Preview: {snippet['name']}", expanded=False):
-                            st.code(snippet['code'][:200] + "..." if len(snippet['code']) > 200 else snippet['code'], 
-                                   language="python")
-                        
-                        if idx < len(snippets) - 1:
-                            st.markdown("---")
-        
-        # AI Suggestions panel
-        if enable_suggestions and st.session_state.suggestions:
-            st.subheader("💡 AI Suggestions")
-            
-            # Group suggestions by type
-            suggestion_types = {}
-            for suggestion in st.session_state.suggestions[:10]:
-                stype = suggestion.get('type', 'general')
-                if stype not in suggestion_types:
-                    suggestion_types[stype] = []
-                suggestion_types[stype].append(suggestion)
-            
-            # Display by category with icons
-            type_icons = {
-                'algorithm': '⚙️',
-                'data_structure': '📊',
-                'ml_algorithm': '🤖',
-                'optimization': '⚡',
-                'snippet': '📝',
-                'completion': '✨',
-                'general': '💡'
-            }
-            
-            for stype, suggestions in suggestion_types.items():
-                icon = type_icons.get(stype, '💡')
-                st.markdown(f"### {icon} {stype.replace('_', ' ').title()}")
-                
-                for i, suggestion in enumerate(suggestions[:3]):
-                    with st.expander(f"{suggestion.get('title', 'Code Enhancement')}"):
-                        st.write(suggestion.get('description', ''))
-                        
-                        if suggestion.get('category'):
-                            st.caption(f"📂 {suggestion['category'].replace('_', ' ').title()}")
-                        
-                        if suggestion.get('code'):
-                            st.code(suggestion['code'], language=st.session_state.language)
-                            unique_key = f"apply_{stype}_{i}_{hash(suggestion['title'])}"
-                            if st.button(f"Apply This", key=unique_key, use_container_width=True):
-                                st.session_state.code = suggestion['code']
-                                st.success(f"✅ Applied: {suggestion['title']}")
-                                st.rerun()
-        
+        lang_cfg = SUPPORTED_LANGUAGES[st.session_state.language]
+        st.subheader(f"📝 Editor ({lang_cfg['name']})")
+
+        # Editor + completions rerun in isolation so keystrokes skip the sidebar/console
+        editor_fragment(ai_service, inline_completion, smart_completion,
+                        enable_suggestions, enable_inline, enable_analysis)
+
         # Execution controls
         col_run, col_stop = st.columns(2)
         with col_run:
             if st.button("▶️ Run Code", type="primary", use_container_width=True):
                 if st.session_state.code.strip():
-                    with st.spinner("Executing code..."):
-                        result = code_executor.execute_code(
-                            st.session_state.code,
-                            st.session_state.language
-                        )
-                        st.session_state.output = result
-        
+                    # Execute in the background so the UI stays responsive;
+                    # the console fragment polls for the result
+                    st.session_state.run_future = get_background_executor().submit(
+                        code_executor.execute_code,
+                        st.session_state.code,
+                        st.session_state.language
+                    )
+
         with col_stop:
             if st.button("⏹️ Stop", use_container_width=True):
                 code_executor.stop_execution()
                 st.session_state.output += "\n[Execution stopped by user]"
-    
+
     with col2:
         st.subheader("📟 Console Output")
-        
+
         # Console output area
-        console_container = st.container()
-        with console_container:
-            if st.session_state.output:
-                st.text_area(
-                    "Output",
-                    value=st.session_state.output,
-                    height=300,
-                    disabled=True,
-                    key="console_output"
-                )
-            else:
-                st.info("Run code to see output here")
-        
+        output_panel()
+
         # Clear console
         if st.button("🗑️ Clear Console", use_container_width=True):
             st.session_state.output = ""
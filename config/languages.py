@@ -1,5 +1,10 @@
 """Configuration for supported programming languages"""
 import re
+import sys
+import types
+from collections import Counter
+
+import streamlit as st
 
 SUPPORTED_LANGUAGES = {
     "python": {
@@ -189,6 +194,41 @@ LANGUAGE_PATTERNS = {
     ]
 }
 
+def _intern_keys(obj):
+    """Recursively intern dict string keys so lookups compare by pointer"""
+    if isinstance(obj, dict):
+        return {sys.intern(k): _intern_keys(v) for k, v in obj.items()}
+    return obj
+
+# The config is read-only at runtime; freeze it and intern the keys so the
+# per-keystroke nested lookups probe by identity instead of memcmp
+SUPPORTED_LANGUAGES = types.MappingProxyType(_intern_keys(SUPPORTED_LANGUAGES))
+
+# Precomputed key views - SUPPORTED_LANGUAGES never changes at runtime
+SUPPORTED_LANGUAGE_KEYS = tuple(SUPPORTED_LANGUAGES.keys())
+SUPPORTED_LANGUAGE_INDEX = {key: i for i, key in enumerate(SUPPORTED_LANGUAGE_KEYS)}
+
+# All detection patterns fused into one alternation so detection scans the
+# source once instead of once per pattern; the matching group name encodes
+# the language ("python__0", "cpp__3", ...)
+_COMBINED_PATTERN_SOURCE = "|".join(
+    f"(?P<{lang}__{i}>{pattern})"
+    for lang, patterns in LANGUAGE_PATTERNS.items()
+    for i, pattern in enumerate(patterns)
+)
+
+# Prefer google-re2's linear-time engine for large pasted buffers; the
+# stdlib backtracking matcher remains the fallback when re2 is absent
+# or rejects the pattern
+_COMBINED_LANGUAGE_PATTERN = None
+try:
+    import re2
+    _COMBINED_LANGUAGE_PATTERN = re2.compile(_COMBINED_PATTERN_SOURCE, re2.IGNORECASE | re2.MULTILINE)
+except Exception:
+    pass
+if _COMBINED_LANGUAGE_PATTERN is None:
+    _COMBINED_LANGUAGE_PATTERN = re.compile(_COMBINED_PATTERN_SOURCE, re.IGNORECASE | re.MULTILINE)
+
 # Code templates for quick start
 CODE_TEMPLATES = {
     "python": {
@@ -309,25 +349,20 @@ def get_supported_languages():
     """Get list of supported language names"""
     return list(SUPPORTED_LANGUAGES.keys())
 
+@st.cache_data(show_spinner=False, max_entries=256)
 def detect_language_from_code(code: str) -> str:
     """Detect language from code patterns"""
     if not code.strip():
         return "python"  # Default
-    
-    scores = {}
-    for lang, patterns in LANGUAGE_PATTERNS.items():
-        score = 0
-        for pattern in patterns:
-            matches = len(re.findall(pattern, code, re.IGNORECASE | re.MULTILINE))
-            score += matches
-        scores[lang] = score
-    
+
+    scores = Counter()
+    for match in _COMBINED_LANGUAGE_PATTERN.finditer(code):
+        scores[match.lastgroup.split("__", 1)[0]] += 1
+
     # Return language with highest score
     if scores:
-        detected = max(scores.items(), key=lambda x: x[1])
-        if detected[1] > 0:
-            return detected[0]
-    
+        return scores.most_common(1)[0][0]
+
     return "python"  # Default fallback
 
 def get_code_template(language: str, template_type: str = "basic") -> str:
@@ -1,241 +1,185 @@
-import ast
-import re
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
 import jedi
 
+# One Project shared across Script constructions; building it per call
+# re-resolves sys.path and the environment every time
+_JEDI_PROJECT = jedi.Project(path=os.getcwd(), environment_path=sys.executable)
+
+# Jedi parsing dominates suggestion latency, so completions are memoized by
+# content digest. Entries are plain tuples - holding Jedi objects would pin
+# the whole parse tree in memory.
+_JEDI_CACHE_MAX = 128
+_jedi_cache: "OrderedDict[bytes, Tuple]" = OrderedDict()
+
+def _cached_jedi_completions(code: str) -> Tuple:
+    """Return (name, description, complete) tuples for the top completions"""
+    key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+    cached = _jedi_cache.get(key)
+    if cached is not None:
+        _jedi_cache.move_to_end(key)
+        return cached
+
+    results = []
+    try:
+        script = jedi.Script(code=code, project=_JEDI_PROJECT)
+        # Try the new API first, then fall back
+        try:
+            completions = script.complete()  # type: ignore
+        except AttributeError:
+            # Jedi API unavailable, skip silently
+            completions = []
+
+        for completion in completions[:2]:
+            complete = completion.complete if hasattr(completion, 'complete') else None
+            # raw=True skips Jedi's signature formatting - the text is
+            # truncated to a 100-char preview anyway
+            docstring = completion.docstring(raw=True) if hasattr(completion, 'docstring') else None
+            results.append((
+                completion.name,
+                docstring[:100] if docstring else f"Add: {completion.name}",
+                complete or ""
+            ))
+    except Exception:
+        # Silently skip if Jedi fails
+        pass
+
+    results = tuple(results)
+    _jedi_cache[key] = results
+    if len(_jedi_cache) > _JEDI_CACHE_MAX:
+        _jedi_cache.popitem(last=False)
+    return results
+
+@dataclass(slots=True)
+class Suggestion:
+    """Normalized suggestion record handed to the UI"""
+    title: str = "Code Enhancement"
+    description: str = ""
+    code: Optional[str] = None
+    category: Optional[str] = None
+    type: str = "general"
+
 class AlgorithmSuggester:
     """Suggests algorithms and design patterns based on code context"""
-    
-    ALGORITHMS = {
-        "sorting": {
-            "quicksort": '''def quicksort(arr):
-    """QuickSort: O(n log n) average, O(n²) worst case"""
-    if len(arr) <= 1:
-        return arr
-    pivot = arr[len(arr) // 2]
-    left = [x for x in arr if x < pivot]
-    middle = [x for x in arr if x == pivot]
-    right = [x for x in arr if x > pivot]
-    return quicksort(left) + middle + quicksort(right)''',
-            
-            "mergesort": '''def mergesort(arr):
-    """MergeSort: O(n log n) guaranteed, stable sorting"""
-    if len(arr) <= 1:
-        return arr
-    mid = len(arr) // 2
-    left = mergesort(arr[:mid])
-    right = mergesort(arr[mid:])
-    return merge(left, right)
 
-def merge(left, right):
-    result = []
-    i = j = 0
-    while i < len(left) and j < len(right):
-        if left[i] <= right[j]:
-            result.append(left[i])
-            i += 1
-        else:
-            result.append(right[j])
-            j += 1
-    result.extend(left[i:])
-    result.extend(right[j:])
-    return result''',
-        },
-        
-        "search": {
-            "binary_search": '''def binary_search(arr, target):
-    """Binary Search: O(log n) for sorted arrays"""
-    left, right = 0, len(arr) - 1
-    while left <= right:
-        mid = (left + right) // 2
-        if arr[mid] == target:
-            return mid
-        elif arr[mid] < target:
-            left = mid + 1
-        else:
-            right = mid - 1
-    return -1''',
-            
-            "dfs": '''def dfs(graph, start, visited=None):
-    """Depth-First Search: O(V+E) graph traversal"""
-    if visited is None:
-        visited = set()
-    visited.add(start)
-    for neighbor in graph[start]:
-        if neighbor not in visited:
-            dfs(graph, neighbor, visited)
-    return visited''',
-        },
-        
-        "data_structures": {
-            "linked_list": '''class Node:
-    def __init__(self, data):
-        self.data = data
-        self.next = None
+    __slots__ = ()
 
-class LinkedList:
-    def __init__(self):
-        self.head = None
-    
-    def append(self, data):
-        if not self.head:
-            self.head = Node(data)
-            return
-        current = self.head
-        while current.next:
-            current = current.next
-        current.next = Node(data)''',
-        },
-        
-        "machine_learning": {
-            "linear_regression": '''import numpy as np
+    @property
+    def ALGORITHMS(self):
+        from services.algorithm_library import ALGORITHMS
+        return ALGORITHMS
 
-class LinearRegression:
-    """Simple Linear Regression with Gradient Descent"""
-    def __init__(self):
-        self.weights = None
-        self.bias = None
-    
-    def fit(self, X, y, learning_rate=0.01, epochs=1000):
-        n_samples, n_features = X.shape
-        self.weights = np.zeros(n_features)
-        self.bias = 0
-        
-        for _ in range(epochs):
-            y_pred = np.dot(X, self.weights) + self.bias
-            dw = (1/n_samples) * np.dot(X.T, (y_pred - y))
-            db = (1/n_samples) * np.sum(y_pred - y)
-            
-            self.weights -= learning_rate * dw
-            self.bias -= learning_rate * db
-    
-    def predict(self, X):
-        return np.dot(X, self.weights) + self.bias''',
-        }
-    }
+    @property
+    def CODE_SNIPPETS(self):
+        from services.algorithm_library import CODE_SNIPPETS
+        return CODE_SNIPPETS
 
-    CODE_SNIPPETS = {
-        "file_operations": '''# Read file
-with open('file.txt', 'r') as f:
-    content = f.read()
+# Trigger keywords mapped to the algorithm category they activate. Fused
+# into one alternation so a single scan of the buffer finds every category,
+# instead of one substring search per keyword. Longest-first keeps
+# multi-word triggers ahead of their prefixes.
+_TRIGGER_CATEGORIES = {
+    "sort": "sorting", "order": "sorting", "arrange": "sorting",
+    "search": "search", "find": "search", "locate": "search",
+    "list": "data_structures", "tree": "data_structures",
+    "graph": "data_structures", "node": "data_structures",
+    "predict": "machine_learning", "classify": "machine_learning",
+    "train": "machine_learning", "model": "machine_learning",
+    "machine learning": "machine_learning", "ml": "machine_learning",
+}
+_TRIGGER_PATTERN = re.compile(
+    "|".join(sorted(map(re.escape, _TRIGGER_CATEGORIES), key=len, reverse=True))
+)
 
-# Write file
-with open('output.txt', 'w') as f:
-    f.write('Hello, World!')''',
-        
-        "error_handling": '''try:
-    result = risky_operation()
-except ValueError as e:
-    print(f"Value error: {e}")
-except Exception as e:
-    print(f"Unexpected error: {e}")
-finally:
-    cleanup()''',
-        
-        "decorators": '''from functools import wraps
-import time
+# The suggester is stateless; every AIService shares one instance
+_ALGORITHM_SUGGESTER = AlgorithmSuggester()
 
-def timer(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        end = time.time()
-        print(f"{func.__name__} took {end-start:.4f}s")
-        return result
-    return wrapper''',
-    }
+# Full suggestion lists are cached too: the same buffer is requested
+# repeatedly across reruns, and the list is read-only downstream
+_SUGGESTION_CACHE_MAX = 64
+_suggestion_cache: "OrderedDict[bytes, List[Suggestion]]" = OrderedDict()
 
 class AIService:
     """Enhanced AI Service with algorithm suggestions and ML integration"""
-    
+
+    __slots__ = ('logger', 'algorithm_suggester')
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.algorithm_suggester = AlgorithmSuggester()
+        self.algorithm_suggester = _ALGORITHM_SUGGESTER
     
-    def get_suggestions(self, code: str, language: str, provider: str = "local") -> List[Dict[str, Any]]:
+    def get_suggestions(self, code: str, language: str, provider: str = "local") -> List[Suggestion]:
         """Get enhanced code suggestions with algorithms and snippets"""
+        key = hashlib.blake2b(
+            f"{provider}|{language}|{code}".encode(), digest_size=16
+        ).digest()
+        cached = _suggestion_cache.get(key)
+        if cached is not None:
+            _suggestion_cache.move_to_end(key)
+            return cached
+
         try:
             suggestions = self._get_local_suggestions(code, language)
-            
+
+            # Lowercase the buffer once; both suggesters scan the same copy
+            code_lower = code.lower()
+
             # Add algorithm suggestions based on context
-            algorithm_suggestions = self._suggest_algorithms(code, language)
+            algorithm_suggestions = self._suggest_algorithms(code, code_lower, language)
             suggestions.extend(algorithm_suggestions)
-            
+
             # Add code snippet suggestions
-            snippet_suggestions = self._suggest_snippets(code, language)
+            snippet_suggestions = self._suggest_snippets(code, code_lower, language)
             suggestions.extend(snippet_suggestions)
-            
-            return suggestions[:10]  # Return top 10 suggestions
+
+            # Normalize once at the boundary so the UI reads plain attributes
+            # instead of chaining .get() calls per field per rerun
+            results = [Suggestion(**s) for s in suggestions[:10]]
         except Exception as e:
             self.logger.error(f"Error getting suggestions: {e}")
             return []
+
+        _suggestion_cache[key] = results
+        if len(_suggestion_cache) > _SUGGESTION_CACHE_MAX:
+            _suggestion_cache.popitem(last=False)
+        return results
     
-    def _suggest_algorithms(self, code: str, language: str) -> List[Dict[str, Any]]:
+    def _suggest_algorithms(self, code: str, code_lower: str, language: str) -> List[Dict[str, Any]]:
         """Suggest relevant algorithms based on code context"""
         suggestions = []
-        
+
         if language != "python":
             return suggestions
-        
-        code_lower = code.lower()
-        
-        # Detect sorting needs
-        if any(word in code_lower for word in ['sort', 'order', 'arrange']):
-            for name, impl in self.algorithm_suggester.ALGORITHMS['sorting'].items():
-                suggestions.append({
-                    "title": f"Implement {name.replace('_', ' ').title()}",
-                    "description": f"Efficient {name} algorithm for sorting data",
-                    "code": impl,
-                    "type": "algorithm",
-                    "category": "sorting"
-                })
-        
-        # Detect search needs
-        if any(word in code_lower for word in ['search', 'find', 'locate']):
-            for name, impl in self.algorithm_suggester.ALGORITHMS['search'].items():
-                suggestions.append({
-                    "title": f"Implement {name.replace('_', ' ').upper()}",
-                    "description": f"{name.upper()} algorithm for efficient searching",
-                    "code": impl,
-                    "type": "algorithm",
-                    "category": "search"
-                })
-        
-        # Detect data structure needs
-        if any(word in code_lower for word in ['list', 'tree', 'graph', 'node']):
-            for name, impl in self.algorithm_suggester.ALGORITHMS['data_structures'].items():
-                suggestions.append({
-                    "title": f"Add {name.replace('_', ' ').title()}",
-                    "description": f"Implement {name} data structure",
-                    "code": impl,
-                    "type": "data_structure",
-                    "category": "data_structures"
-                })
-        
-        # Detect ML/AI needs
-        if any(word in code_lower for word in ['predict', 'classify', 'train', 'model', 'machine learning', 'ml']):
-            for name, impl in self.algorithm_suggester.ALGORITHMS['machine_learning'].items():
-                suggestions.append({
-                    "title": f"Implement {name.replace('_', ' ').title()}",
-                    "description": f"Machine learning: {name} algorithm",
-                    "code": impl,
-                    "type": "ml_algorithm",
-                    "category": "machine_learning"
-                })
-        
+
+        # One pass over the buffer finds every triggered category
+        matched = {
+            _TRIGGER_CATEGORIES[match.group(0)]
+            for match in _TRIGGER_PATTERN.finditer(code_lower)
+        }
+
+        if matched:
+            # Suggestion dicts are pre-built per category at template load
+            # time; detection just splices the shared lists together
+            from services.algorithm_library import ALGORITHM_SUGGESTIONS
+            for category in ("sorting", "search", "data_structures", "machine_learning"):
+                if category in matched:
+                    suggestions.extend(ALGORITHM_SUGGESTIONS[category])
+
         return suggestions[:5]
     
-    def _suggest_snippets(self, code: str, language: str) -> List[Dict[str, Any]]:
+    def _suggest_snippets(self, code: str, code_lower: str, language: str) -> List[Dict[str, Any]]:
         """Suggest useful code snippets"""
         suggestions = []
-        
+
         if language != "python":
             return suggestions
-        
-        code_lower = code.lower()
-        
+
         # File operation snippets
         if 'file' in code_lower or 'read' in code_lower or 'write' in code_lower:
             suggestions.append({
@@ -246,7 +190,7 @@ class AIService:
             })
         
         # Error handling
-        if 'try' not in code and len(code.split('\n')) > 5:
+        if 'try' not in code and code.count('\n') >= 5:
             suggestions.append({
                 "title": "Add Error Handling",
                 "description": "Robust error handling pattern",
@@ -268,30 +212,16 @@ class AIService:
     def _get_local_suggestions(self, code: str, language: str) -> List[Dict[str, Any]]:
         """Get local code suggestions using Jedi"""
         suggestions = []
-        
-        if language == "python":
-            try:
-                script = jedi.Script(code=code)
-                # Try the new API first, then fall back
-                try:
-                    completions = script.complete()  # type: ignore
-                except AttributeError:
-                    # Jedi API unavailable, skip silently
-                    return suggestions
-                
-                for completion in completions[:2]:
-                    suggestion_code = code
-                    if hasattr(completion, 'complete') and completion.complete:
-                        suggestion_code = code + completion.complete
-                    
-                    suggestions.append({
-                        "title": f"Complete: {completion.name}",
-                        "description": completion.docstring()[:100] if hasattr(completion, 'docstring') and completion.docstring() else f"Add: {completion.name}",
-                        "code": suggestion_code,
-                        "type": "completion"
-                    })
-            except Exception:
-                # Silently skip if Jedi fails
-                pass
-        
+
+        # Jedi setup is not worth it for near-empty buffers; nothing
+        # meaningful completes off fewer than a handful of characters
+        if language == "python" and len(code.strip()) >= 4:
+            for name, description, complete in _cached_jedi_completions(code):
+                suggestions.append({
+                    "title": f"Complete: {name}",
+                    "description": description,
+                    "code": code + complete if complete else code,
+                    "type": "completion"
+                })
+
         return suggestions
@@ -0,0 +1,201 @@
+"""Reference algorithm implementations and code snippets.
+
+Kept out of ai_service so the several KB of template literals are only
+parsed and interned the first time a suggestion actually needs them.
+"""
+
+ALGORITHMS = {
+        "sorting": {
+            "quicksort": '''def quicksort(arr):
+    """QuickSort: O(n log n) average, iterative (no recursion limit).
+
+    Small inputs fall back to the built-in Timsort, which is faster
+    and allocation-free compared to slicing-based partitioning.
+    """
+    if len(arr) < 2048:
+        return sorted(arr)
+    arr = list(arr)
+    stack = [(0, len(arr) - 1)]
+    while stack:
+        low, high = stack.pop()
+        if low >= high:
+            continue
+        pivot = arr[(low + high) // 2]
+        i, j = low, high
+        while i <= j:
+            while arr[i] < pivot:
+                i += 1
+            while arr[j] > pivot:
+                j -= 1
+            if i <= j:
+                arr[i], arr[j] = arr[j], arr[i]
+                i += 1
+                j -= 1
+        stack.append((low, j))
+        stack.append((i, high))
+    return arr''',
+
+            "mergesort": '''def mergesort(arr):
+    """MergeSort: O(n log n) guaranteed, stable, bottom-up iterative"""
+    arr = list(arr)
+    n = len(arr)
+    width = 1
+    while width < n:
+        for left in range(0, n, 2 * width):
+            mid = min(left + width, n)
+            right = min(left + 2 * width, n)
+            arr[left:right] = merge(arr[left:mid], arr[mid:right])
+        width *= 2
+    return arr
+
+def merge(left, right):
+    result = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i] <= right[j]:
+            result.append(left[i])
+            i += 1
+        else:
+            result.append(right[j])
+            j += 1
+    result.extend(left[i:])
+    result.extend(right[j:])
+    return result''',
+        },
+        
+        "search": {
+            "binary_search": '''def binary_search(arr, target):
+    """Binary Search: O(log n) for sorted arrays"""
+    left, right = 0, len(arr) - 1
+    while left <= right:
+        mid = (left + right) // 2
+        if arr[mid] == target:
+            return mid
+        elif arr[mid] < target:
+            left = mid + 1
+        else:
+            right = mid - 1
+    return -1''',
+            
+            "dfs": '''def dfs(graph, start, visited=None):
+    """Depth-First Search: O(V+E) graph traversal"""
+    if visited is None:
+        visited = set()
+    visited.add(start)
+    for neighbor in graph[start]:
+        if neighbor not in visited:
+            dfs(graph, neighbor, visited)
+    return visited''',
+        },
+        
+        "data_structures": {
+            "linked_list": '''class Node:
+    def __init__(self, data):
+        self.data = data
+        self.next = None
+
+class LinkedList:
+    def __init__(self):
+        self.head = None
+    
+    def append(self, data):
+        if not self.head:
+            self.head = Node(data)
+            return
+        current = self.head
+        while current.next:
+            current = current.next
+        current.next = Node(data)''',
+        },
+        
+        "machine_learning": {
+            "linear_regression": '''import numpy as np
+
+class LinearRegression:
+    """Simple Linear Regression with Gradient Descent"""
+    def __init__(self):
+        self.weights = None
+        self.bias = None
+    
+    def fit(self, X, y, learning_rate=0.01, epochs=1000):
+        n_samples, n_features = X.shape
+        self.weights = np.zeros(n_features)
+        self.bias = 0
+        
+        for _ in range(epochs):
+            y_pred = np.dot(X, self.weights) + self.bias
+            dw = (1/n_samples) * np.dot(X.T, (y_pred - y))
+            db = (1/n_samples) * np.sum(y_pred - y)
+            
+            self.weights -= learning_rate * dw
+            self.bias -= learning_rate * db
+    
+    def predict(self, X):
+        return np.dot(X, self.weights) + self.bias''',
+        }
+    }
+
+CODE_SNIPPETS = {
+        "file_operations": '''# Read file
+with open('file.txt', 'r') as f:
+    content = f.read()
+
+# Write file
+with open('output.txt', 'w') as f:
+    f.write('Hello, World!')''',
+        
+        "error_handling": '''try:
+    result = risky_operation()
+except ValueError as e:
+    print(f"Value error: {e}")
+except Exception as e:
+    print(f"Unexpected error: {e}")
+finally:
+    cleanup()''',
+        
+        "decorators": '''from functools import wraps
+import time
+
+def timer(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.time()
+        result = func(*args, **kwargs)
+        end = time.time()
+        print(f"{func.__name__} took {end-start:.4f}s")
+        return result
+    return wrapper''',
+    }
+
+def _build_suggestions(category, title_fmt, description_fmt, suggestion_type):
+    return [
+        {
+            "title": title_fmt.format(
+                title=name.replace('_', ' ').title(),
+                upper=name.replace('_', ' ').upper()),
+            "description": description_fmt.format(name=name, upper=name.upper()),
+            "code": impl,
+            "type": suggestion_type,
+            "category": category,
+        }
+        for name, impl in ALGORITHMS[category].items()
+    ]
+
+# Fully-built suggestion dicts, one list per category. Titles and
+# descriptions depend only on the template name, so the string formatting
+# runs once here instead of on every detection hit. The dicts are shared -
+# downstream code copies fields into Suggestion records without mutating.
+ALGORITHM_SUGGESTIONS = {
+    "sorting": _build_suggestions(
+        "sorting", "Implement {title}",
+        "Efficient {name} algorithm for sorting data", "algorithm"),
+    "search": _build_suggestions(
+        "search", "Implement {upper}",
+        "{upper} algorithm for efficient searching", "algorithm"),
+    "data_structures": _build_suggestions(
+        "data_structures", "Add {title}",
+        "Implement {name} data structure", "data_structure"),
+    "machine_learning": _build_suggestions(
+        "machine_learning", "Implement {title}",
+        "Machine learning: {name} algorithm", "ml_algorithm"),
+}
@@ -0,0 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+@st.cache_resource
+def get_background_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for off-loading analysis from the rerun loop"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="editor-analysis")
+
+def harvest_future(state_key: str, result_key: str):
+    """Move a finished future's result into session state, if ready"""
+    future = st.session_state.get(state_key)
+    if future is not None and future.done():
+        st.session_state[state_key] = None
+        try:
+            st.session_state[result_key] = future.result()
+        except Exception:
+            # Workers already report their own errors; keep stale results
+            pass
@@ -1,14 +1,24 @@
+import functools
+import re
+import shutil
 import subprocess
 import threading
 import time
 import os
 import tempfile
 import signal
-import psutil
 from typing import Optional, Dict, Any
 import shlex
+from collections import deque
 from utils.security import SecurityManager
 
+# Compiled once; extraction runs per Java execution request
+_JAVA_CLASS_RE = re.compile(r'public\s+class\s+(\w+)')
+
+# Output ring-buffer cap - a runaway print loop keeps only the most
+# recent lines instead of buffering the whole stream in memory
+_MAX_OUTPUT_LINES = 2000
+
 class CodeExecutor:
     """Service for secure code execution with resource limits"""
     
@@ -16,6 +26,25 @@ class CodeExecutor:
         self.current_process = None
         self.security_manager = SecurityManager()
         self.execution_lock = threading.Lock()
+        # Interpreter spawned ahead of time so the fork+startup cost
+        # (~100 ms) is paid while the user is still typing, not on Run
+        self._warm_python = self._spawn_warm_python()
+
+    def _spawn_warm_python(self):
+        """Start a python3 process that waits for code on stdin"""
+        try:
+            return subprocess.Popen(
+                ['python3', '-c',
+                 'import sys; exec(compile(sys.stdin.read(), "<editor>", "exec"))'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                start_new_session=True,
+                env=os.environ.copy()
+            )
+        except Exception:
+            return None
     
     def execute_code(self, code: str, language: str) -> str:
         """Execute code in a secure environment"""
@@ -45,27 +74,24 @@ class CodeExecutor:
     def _execute_python(self, code: str) -> str:
         """Execute Python code"""
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            # Execute with resource limits
-            cmd = [
-                'python3', 
-                temp_file
-            ]
-            
-            result = self._run_with_limits(cmd, timeout=10)
-            
-            # Cleanup
+            # Take the pre-warmed interpreter and immediately start
+            # warming the next one for the following run
+            proc = self._warm_python
+            self._warm_python = self._spawn_warm_python()
+            if proc is None or proc.poll() is not None:
+                proc = self._spawn_warm_python()
+            if proc is None:
+                return "❌ Python execution error: could not start interpreter"
+
+            self.current_process = proc
             try:
-                os.unlink(temp_file)
-            except:
-                pass
-                
-            return result
-            
+                proc.stdin.write(code)
+                proc.stdin.close()
+            except BrokenPipeError:
+                return "❌ Python execution error: interpreter exited early"
+
+            return self._collect_output(proc, timeout=10)
+
         except Exception as e:
             return f"❌ Python execution error: {str(e)}"
     
@@ -75,23 +101,10 @@ class CodeExecutor:
             # Check if node is available
             if not self._check_command_available('node'):
                 return "❌ Node.js not available for JavaScript execution"
-            
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            cmd = ['node', temp_file]
-            result = self._run_with_limits(cmd, timeout=10)
-            
-            # Cleanup
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
-                
-            return result
-            
+
+            # Pipe the source straight to node; no tempfile round-trip
+            return self._run_with_limits(['node', '-'], timeout=10, input_text=code)
+
         except Exception as e:
             return f"❌ JavaScript execution error: {str(e)}"
     
@@ -126,7 +139,6 @@ class CodeExecutor:
             result = self._run_with_limits(exec_cmd, timeout=10, cwd=temp_dir)
             
             # Cleanup
-            import shutil
             shutil.rmtree(temp_dir, ignore_errors=True)
             
             return result
@@ -170,34 +182,72 @@ class CodeExecutor:
         except Exception as e:
             return f"❌ C++ execution error: {str(e)}"
     
-    def _run_with_limits(self, cmd: list, timeout: int = 10, cwd: Optional[str] = None) -> str:
+    def _run_with_limits(self, cmd: list, timeout: int = 10, cwd: Optional[str] = None,
+                         input_text: Optional[str] = None) -> str:
         """Run command with resource limits"""
         try:
             # Set environment
             env = os.environ.copy()
-            
+
             self.current_process = subprocess.Popen(
                 cmd,
+                stdin=subprocess.PIPE if input_text is not None else None,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
                 cwd=cwd,
+                start_new_session=True,
                 env=env
             )
-            
+
+            if input_text is not None:
+                try:
+                    self.current_process.stdin.write(input_text)
+                    self.current_process.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+            return self._collect_output(self.current_process, timeout)
+
+        except Exception as e:
+            return f"❌ Process execution error: {str(e)}"
+
+    def _collect_output(self, process, timeout: int) -> str:
+        """Wait for a process, draining its stdout into a bounded buffer"""
+        try:
+            # Drain stdout as it arrives into a bounded deque; communicate()
+            # would buffer everything and let a chatty process exhaust memory
+            ring = deque(maxlen=_MAX_OUTPUT_LINES)
+            truncated = False
+
+            def _drain(stream):
+                nonlocal truncated
+                for line in stream:
+                    if len(ring) == _MAX_OUTPUT_LINES:
+                        truncated = True
+                    ring.append(line)
+
+            reader = threading.Thread(
+                target=_drain, args=(process.stdout,), daemon=True
+            )
+            reader.start()
+
             try:
-                output, _ = self.current_process.communicate(timeout=timeout)
-                return_code = self.current_process.returncode
-                
+                return_code = process.wait(timeout=timeout)
+                reader.join(timeout=1)
+                output = ''.join(ring)
+                if truncated:
+                    output = "[output truncated]\n" + output
+
                 if return_code == 0:
                     return f"✅ Execution completed:\n{output}" if output else "✅ Execution completed (no output)"
                 else:
                     return f"⚠️ Execution completed with errors (exit code {return_code}):\n{output}"
-                    
+
             except subprocess.TimeoutExpired:
-                self.current_process.kill()
+                process.kill()
                 return "❌ Execution timeout - process killed"
-                
+
         except Exception as e:
             return f"❌ Process execution error: {str(e)}"
         finally:
@@ -207,30 +257,24 @@ class CodeExecutor:
         """Stop currently running execution"""
         if self.current_process:
             try:
-                # Kill process tree
-                parent = psutil.Process(self.current_process.pid)
-                children = parent.children(recursive=True)
-                for child in children:
-                    child.kill()
-                parent.kill()
-            except:
+                # Children run in their own session, so one killpg takes
+                # down the whole tree atomically - no /proc traversal
+                os.killpg(os.getpgid(self.current_process.pid), signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
                 pass
             self.current_process = None
     
-    def _check_command_available(self, command: str) -> bool:
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _check_command_available(command: str) -> bool:
         """Check if a command is available in PATH"""
-        try:
-            subprocess.run([command, '--version'], 
-                         capture_output=True, 
-                         timeout=5)
-            return True
-        except:
-            return False
+        # A PATH lookup instead of forking 'cmd --version'; the answer
+        # doesn't change within a session, so cache it too
+        return shutil.which(command) is not None
     
     def _extract_java_class_name(self, code: str) -> Optional[str]:
         """Extract public class name from Java code"""
-        import re
-        match = re.search(r'public\s+class\s+(\w+)', code)
+        match = _JAVA_CLASS_RE.search(code)
         return match.group(1) if match else None
     
     def get_execution_status(self) -> Dict[str, Any]:
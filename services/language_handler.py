@@ -1,5 +1,11 @@
+import functools
+import hashlib
+import os
 import re
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_right
+from collections import Counter, OrderedDict, deque
+from typing import Dict, List, Optional, Any, Tuple
 from pygments import highlight
 from pygments.lexers import get_lexer_by_name
 from pygments.formatters import TerminalFormatter
@@ -7,6 +13,146 @@ import ast
 import tokenize
 import io
 
+# Every pattern in this module is compiled once at import; detection and
+# extraction run per keystroke and recompilation dominated on short inputs
+_DETECT_PATTERN_SOURCES = {
+    "python": [
+        r"def\s+\w+\s*\(",
+        r"import\s+\w+",
+        r"from\s+\w+\s+import",
+        r"print\s*\(",
+        r"if\s+__name__\s*==\s*[\"']__main__[\"']"
+    ],
+    "javascript": [
+        r"function\s+\w+\s*\(",
+        r"var\s+\w+\s*=",
+        r"let\s+\w+\s*=",
+        r"const\s+\w+\s*=",
+        r"console\.log\s*\(",
+        r"document\.",
+        r"window\."
+    ],
+    "java": [
+        r"public\s+class\s+\w+",
+        r"public\s+static\s+void\s+main",
+        r"System\.out\.println",
+        r"import\s+java\.",
+        r"@Override"
+    ],
+    "cpp": [
+        r"#include\s*<\w+>",
+        r"int\s+main\s*\(",
+        r"std::",
+        r"cout\s*<<",
+        r"cin\s*>>",
+        r"using\s+namespace\s+std"
+    ]
+}
+# All detection patterns fused into one alternation so detection scans
+# the buffer once instead of once per pattern; the matching group name
+# encodes the language, same scheme as config.languages
+_COMBINED_DETECT_PATTERN = re.compile(
+    "|".join(
+        f"(?P<{lang}__{i}>{pattern})"
+        for lang, patterns in _DETECT_PATTERN_SOURCES.items()
+        for i, pattern in enumerate(patterns)
+    ),
+    re.IGNORECASE | re.MULTILINE
+)
+
+# The Java/C++ patterns use possessive quantifiers (Python 3.11+) on the
+# type and whitespace runs: none of those repeats ever needs to give
+# characters back for a real match, and forbidding the retry keeps
+# degenerate pasted input (long word runs that almost match) linear
+# instead of backtracking-quadratic
+_FUNCTION_PATTERNS = {
+    "javascript": re.compile(r"function\s+(\w+)\s*\(([^)]*)\)", re.MULTILINE),
+    "java": re.compile(r"(?:public|private|protected)?\s*+(?:static\s++)?[\w<>\[\]]++\s++(\w+)\s*+\(([^)]*+)\)", re.MULTILINE),
+    "cpp": re.compile(r"[\w<>\[\]*&]++\s++(\w+)\s*+\(([^)]*+)\)", re.MULTILINE),
+}
+
+_CLASS_PATTERNS = {
+    "javascript": re.compile(r"class\s+(\w+)(?:\s+extends\s+(\w+))?\s*\{", re.MULTILINE),
+    "java": re.compile(r"(?:public|private)?\s*class\s+(\w+)(?:\s+extends\s+(\w+))?", re.MULTILINE),
+    "cpp": re.compile(r"class\s+(\w+)(?:\s*:\s*(?:public|private|protected)\s+(\w+))?", re.MULTILINE),
+}
+
+# Branch-introducing AST nodes counted as complexity for Python buffers
+_COMPLEXITY_NODES = (ast.If, ast.For, ast.While, ast.Try, ast.ExceptHandler)
+
+# Branch keywords for the non-Python complexity estimate; one bounded
+# regex scan of the buffer replaces a substring count per keyword per
+# line (which also matched 'if' inside words like 'gift')
+_COMPLEXITY_RE = re.compile(r"\b(?:if|elif|else|for|while|try|except|catch|switch|case)\b")
+
+# Code-intel calls cluster on the same buffer (extract functions, then
+# classes, then metrics...); a handful of parse results covers them all
+_PARSE_CACHE_MAX = 8
+
+# Node kinds that can carry further statements; everything else
+# (expressions, comprehensions) can never contain a def or import
+_STMT_NODES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+
+def _walk_statements(tree):
+    """Breadth-first over statement nodes only
+
+    Definitions and imports only ever sit in statement position, so
+    skipping expression subtrees visits a fraction of what ast.walk
+    does while yielding the same nodes in the same relative order.
+    """
+    todo = deque(n for n in ast.iter_child_nodes(tree) if isinstance(n, _STMT_NODES))
+    while todo:
+        node = todo.popleft()
+        yield node
+        todo.extend(n for n in ast.iter_child_nodes(node) if isinstance(n, _STMT_NODES))
+
+
+def _fast_docstring(node) -> Optional[str]:
+    """Docstring of a def/class without ast.get_docstring's cleandoc pass
+
+    The outline only displays the text, so the indentation cleanup (an
+    extra allocation and scan per definition) buys nothing here.
+    """
+    body = node.body
+    if body and isinstance(body[0], ast.Expr):
+        value = body[0].value
+        if isinstance(value, ast.Constant) and isinstance(value.value, str):
+            return value.value
+    return None
+
+
+def _newline_offsets(code: str) -> List[int]:
+    """Offsets of every newline, built once so match positions map to
+    line numbers with a binary search instead of counting a prefix slice
+    per match"""
+    offsets = []
+    pos = code.find('\n')
+    while pos != -1:
+        offsets.append(pos)
+        pos = code.find('\n', pos + 1)
+    return offsets
+
+
+# One formatter serves every call - it is stateless - and lexers are
+# cached per language so Pygments' registry lookup and token-table setup
+# run once instead of per highlight
+_FORMATTER = TerminalFormatter()
+
+
+@functools.lru_cache(maxsize=8)
+def _get_lexer(language: str):
+    return get_lexer_by_name(language)
+
+
+_IMPORT_PATTERNS = {
+    "javascript": [re.compile(r"import\s+.*?from\s+['\"]([^'\"]+)['\"]", re.MULTILINE),
+                   re.compile(r"require\s*\(\s*['\"]([^'\"]+)['\"]", re.MULTILINE)],
+    "java": [re.compile(r"import\s+([\w.]+)", re.MULTILINE)],
+    "cpp": [re.compile(r"#include\s*[<\"]([^>\"]+)[>\"]", re.MULTILINE)],
+}
+
+
 class LanguageHandler:
     """Handler for language-specific operations"""
     
@@ -37,70 +183,49 @@ class LanguageHandler:
                 "multiline_comment": ('/*', '*/')
             }
         }
-    
+        self._parse_cache: "OrderedDict[bytes, Any]" = OrderedDict()
+
+    def _get_tree(self, code: str):
+        """Parse a buffer once, memoizing the tree - or the SyntaxError
+
+        Returns either an ast.Module or the SyntaxError the parse raised;
+        callers check which they got. Caching the failure matters too, so
+        validate_syntax doesn't re-parse unchanged broken code.
+        """
+        key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+        cached = self._parse_cache.get(key)
+        if cached is None:
+            try:
+                cached = ast.parse(code)
+            except SyntaxError as e:
+                cached = e
+            self._parse_cache[key] = cached
+            if len(self._parse_cache) > _PARSE_CACHE_MAX:
+                self._parse_cache.popitem(last=False)
+        else:
+            self._parse_cache.move_to_end(key)
+        return cached
+
     def detect_language(self, code: str) -> str:
         """Detect programming language from code content"""
         if not code.strip():
             return "python"  # Default
         
-        # Check for language-specific patterns
-        patterns = {
-            "python": [
-                r"def\s+\w+\s*\(",
-                r"import\s+\w+",
-                r"from\s+\w+\s+import",
-                r"print\s*\(",
-                r"if\s+__name__\s*==\s*[\"']__main__[\"']"
-            ],
-            "javascript": [
-                r"function\s+\w+\s*\(",
-                r"var\s+\w+\s*=",
-                r"let\s+\w+\s*=",
-                r"const\s+\w+\s*=",
-                r"console\.log\s*\(",
-                r"document\.",
-                r"window\."
-            ],
-            "java": [
-                r"public\s+class\s+\w+",
-                r"public\s+static\s+void\s+main",
-                r"System\.out\.println",
-                r"import\s+java\.",
-                r"@Override"
-            ],
-            "cpp": [
-                r"#include\s*<\w+>",
-                r"int\s+main\s*\(",
-                r"std::",
-                r"cout\s*<<",
-                r"cin\s*>>",
-                r"using\s+namespace\s+std"
-            ]
-        }
-        
-        # Score each language
-        scores = {}
-        for lang, lang_patterns in patterns.items():
-            score = 0
-            for pattern in lang_patterns:
-                if re.search(pattern, code, re.IGNORECASE | re.MULTILINE):
-                    score += 1
-            scores[lang] = score
-        
+        # One scan of the buffer scores every language at once
+        scores = Counter()
+        for match in _COMBINED_DETECT_PATTERN.finditer(code):
+            scores[match.lastgroup.split("__", 1)[0]] += 1
+
         # Return language with highest score
         if scores:
-            detected = max(scores.items(), key=lambda x: x[1])
-            if detected[1] > 0:
-                return detected[0]
-        
+            return scores.most_common(1)[0][0]
+
         return "python"  # Default fallback
     
     def get_syntax_highlighting(self, code: str, language: str) -> str:
         """Get syntax highlighted code"""
         try:
-            lexer = get_lexer_by_name(language)
-            formatter = TerminalFormatter()
-            return highlight(code, lexer, formatter)
+            return highlight(code, _get_lexer(language), _FORMATTER)
         except:
             return code  # Return original if highlighting fails
     
@@ -109,30 +234,22 @@ class LanguageHandler:
         functions = []
         
         if language == "python":
-            try:
-                tree = ast.parse(code)
-                for node in ast.walk(tree):
+            tree = self._get_tree(code)
+            if not isinstance(tree, SyntaxError):
+                for node in _walk_statements(tree):
                     if isinstance(node, ast.FunctionDef):
                         functions.append({
                             "name": node.name,
                             "line": node.lineno,
                             "args": [arg.arg for arg in node.args.args],
-                            "docstring": ast.get_docstring(node)
+                            "docstring": _fast_docstring(node)
                         })
-            except:
-                pass
         
         elif language in ["javascript", "java", "cpp"]:
             # Use regex patterns for other languages
-            if language == "javascript":
-                pattern = r"function\s+(\w+)\s*\(([^)]*)\)"
-            elif language == "java":
-                pattern = r"(?:public|private|protected)?\s*(?:static\s+)?[\w<>\[\]]+\s+(\w+)\s*\(([^)]*)\)"
-            else:  # cpp
-                pattern = r"[\w<>\[\]*&]+\s+(\w+)\s*\(([^)]*)\)"
-            
-            for match in re.finditer(pattern, code, re.MULTILINE):
-                line_num = code[:match.start()].count('\n') + 1
+            newlines = _newline_offsets(code)
+            for match in _FUNCTION_PATTERNS[language].finditer(code):
+                line_num = bisect_right(newlines, match.start()) + 1
                 functions.append({
                     "name": match.group(1),
                     "line": line_num,
@@ -147,30 +264,22 @@ class LanguageHandler:
         classes = []
         
         if language == "python":
-            try:
-                tree = ast.parse(code)
-                for node in ast.walk(tree):
+            tree = self._get_tree(code)
+            if not isinstance(tree, SyntaxError):
+                for node in _walk_statements(tree):
                     if isinstance(node, ast.ClassDef):
                         classes.append({
                             "name": node.name,
                             "line": node.lineno,
                             "bases": [ast.unparse(base) if hasattr(ast, 'unparse') else str(base) 
                                     for base in node.bases],
-                            "docstring": ast.get_docstring(node)
+                            "docstring": _fast_docstring(node)
                         })
-            except:
-                pass
-        
+
         elif language in ["javascript", "java", "cpp"]:
-            if language == "javascript":
-                pattern = r"class\s+(\w+)(?:\s+extends\s+(\w+))?\s*\{"
-            elif language == "java":
-                pattern = r"(?:public|private)?\s*class\s+(\w+)(?:\s+extends\s+(\w+))?"
-            else:  # cpp
-                pattern = r"class\s+(\w+)(?:\s*:\s*(?:public|private|protected)\s+(\w+))?"
-            
-            for match in re.finditer(pattern, code, re.MULTILINE):
-                line_num = code[:match.start()].count('\n') + 1
+            newlines = _newline_offsets(code)
+            for match in _CLASS_PATTERNS[language].finditer(code):
+                line_num = bisect_right(newlines, match.start()) + 1
                 classes.append({
                     "name": match.group(1),
                     "line": line_num,
@@ -185,9 +294,9 @@ class LanguageHandler:
         imports = []
         
         if language == "python":
-            try:
-                tree = ast.parse(code)
-                for node in ast.walk(tree):
+            tree = self._get_tree(code)
+            if not isinstance(tree, SyntaxError):
+                for node in _walk_statements(tree):
                     if isinstance(node, ast.Import):
                         for alias in node.names:
                             imports.append(alias.name)
@@ -195,19 +304,11 @@ class LanguageHandler:
                         module = node.module or ""
                         for alias in node.names:
                             imports.append(f"{module}.{alias.name}" if module else alias.name)
-            except:
-                pass
         
         else:
             # Use regex for other languages
-            patterns = {
-                "javascript": [r"import\s+.*?from\s+['\"]([^'\"]+)['\"]", r"require\s*\(\s*['\"]([^'\"]+)['\"]"],
-                "java": [r"import\s+([\w.]+)"],
-                "cpp": [r"#include\s*[<\"]([^>\"]+)[>\"]"]
-            }
-            
-            for pattern in patterns.get(language, []):
-                for match in re.finditer(pattern, code, re.MULTILINE):
+            for pattern in _IMPORT_PATTERNS.get(language, []):
+                for match in pattern.finditer(code):
                     imports.append(match.group(1))
         
         return imports
@@ -217,14 +318,13 @@ class LanguageHandler:
         result = {"valid": True, "errors": []}
         
         if language == "python":
-            try:
-                ast.parse(code)
-            except SyntaxError as e:
+            tree = self._get_tree(code)
+            if isinstance(tree, SyntaxError):
                 result["valid"] = False
                 result["errors"].append({
-                    "line": e.lineno,
-                    "column": e.offset,
-                    "message": e.msg,
+                    "line": tree.lineno,
+                    "column": tree.offset,
+                    "message": tree.msg,
                     "type": "SyntaxError"
                 })
         
@@ -235,33 +335,94 @@ class LanguageHandler:
     def get_code_metrics(self, code: str, language: str) -> Dict[str, Any]:
         """Get code quality metrics"""
         lines = code.split('\n')
-        
+
+        # Classify every line exactly once; the old comprehensions walked
+        # the list three times and called _is_comment twice per line.
+        # The comment prefix never changes inside the loop, so the config
+        # double-lookup happens once instead of per line.
+        prefix = self.language_configs.get(language, {}).get("comment_prefix", "#")
+        code_lines = comment_lines = blank_lines = 0
+        for line in lines:
+            stripped = line.strip()
+            if not stripped:
+                blank_lines += 1
+            elif stripped.startswith(prefix):
+                comment_lines += 1
+            else:
+                code_lines += 1
+
         metrics = {
             "total_lines": len(lines),
-            "code_lines": len([line for line in lines if line.strip() and not self._is_comment(line, language)]),
-            "comment_lines": len([line for line in lines if self._is_comment(line, language)]),
-            "blank_lines": len([line for line in lines if not line.strip()]),
-            "functions": len(self.extract_functions(code, language)),
-            "classes": len(self.extract_classes(code, language))
+            "code_lines": code_lines,
+            "comment_lines": comment_lines,
+            "blank_lines": blank_lines,
         }
-        
-        # Calculate complexity (simplified)
-        complexity_keywords = ['if', 'else', 'elif', 'for', 'while', 'try', 'except', 'catch', 'switch', 'case']
-        complexity = sum(line.lower().count(keyword) for line in lines for keyword in complexity_keywords)
-        metrics["complexity"] = complexity
-        
+
+        if language == "python":
+            # One parse and one walk collect function/class counts and
+            # complexity together; going through extract_functions and
+            # extract_classes parsed the same source twice, and counting
+            # branch nodes beats substring counting ('gift' matched 'if')
+            functions = classes = complexity = 0
+            tree = self._get_tree(code)
+            if not isinstance(tree, SyntaxError):
+                for node in ast.walk(tree):
+                    node_type = type(node)
+                    if node_type is ast.FunctionDef:
+                        functions += 1
+                    elif node_type is ast.ClassDef:
+                        classes += 1
+                    elif node_type in _COMPLEXITY_NODES:
+                        complexity += 1
+            metrics["functions"] = functions
+            metrics["classes"] = classes
+            metrics["complexity"] = complexity
+        else:
+            metrics["functions"] = len(self.extract_functions(code, language))
+            metrics["classes"] = len(self.extract_classes(code, language))
+
+            # Calculate complexity (simplified)
+            metrics["complexity"] = sum(
+                1 for _ in _COMPLEXITY_RE.finditer(code.lower())
+            )
+
         return metrics
     
+    def batch_analyze(self, files: List[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """Analyze several (path, code) buffers concurrently.
+
+        Extraction is independent per file, so a worker pool spreads the
+        parsing across cores; the shared parse cache means each buffer is
+        still parsed at most once. Mirrors CodeAnalyzer.analyze_many.
+        """
+        def _analyze_one(item):
+            path, code = item
+            language = self.detect_language(code)
+            return path, {
+                "language": language,
+                "functions": self.extract_functions(code, language),
+                "classes": self.extract_classes(code, language),
+                "imports": self.get_imports(code, language),
+            }
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            return dict(executor.map(_analyze_one, files))
+
     def _is_comment(self, line: str, language: str) -> bool:
         """Check if line is a comment"""
-        line = line.strip()
-        if not line:
+        # startswith with a start offset checks the prefix in place, so
+        # no stripped copy of the line is allocated per call
+        i = 0
+        n = len(line)
+        while i < n and line[i] in ' \t':
+            i += 1
+        if i == n:
             return False
-        
+
         config = self.language_configs.get(language, {})
         comment_prefix = config.get("comment_prefix", "#")
-        
-        return line.startswith(comment_prefix)
+
+        return line.startswith(comment_prefix, i)
     
     def get_language_info(self, language: str) -> Dict[str, Any]:
         """Get information about a programming language"""
@@ -1,14 +1,125 @@
 import ast
+import hashlib
+import heapq
+import os
 import re
+import sys
+from collections import OrderedDict, namedtuple
+from operator import itemgetter
 from typing import List, Dict, Optional, Tuple
 import jedi
 
+# One Project shared across Script constructions, as in ai_service;
+# building it per call re-resolves sys.path and the environment each time
+_JEDI_PROJECT = jedi.Project(path=os.getcwd(), environment_path=sys.executable)
+
+# Predictions are memoized by content digest - the editor re-asks about
+# the same buffer on every rerun and cursor move, and misses store None
+# too so known-quiet buffers return immediately. The Jedi leg gets its
+# own cache since it is the dominant per-call cost.
+# Flat row per pattern for the hot loops: attribute reads on a tuple
+# instead of two dict lookups per field, and one contiguous sequence to
+# iterate. The authoring dict stays as the source of truth.
+_PatternRow = namedtuple(
+    "_PatternRow", "name triggers_lower trigger_words keywords_lower code first_line"
+)
+
+_PREDICT_CACHE_MAX = 256
+_predict_cache: "OrderedDict[bytes, Optional[Dict]]" = OrderedDict()
+_JEDI_CACHE_MAX = 128
+_jedi_cache: "OrderedDict[bytes, Optional[Dict]]" = OrderedDict()
+
+# Structural patterns compiled once; _predict_next_line runs per
+# keystroke and re.search's cache lookup plus flag parsing showed up
+# on the hot path
+_DEF_RE = re.compile(r'def\s+(\w+)\s*\((.*?)\)')
+_CLASS_RE = re.compile(r'class\s+(\w+)')
+_FOR_RE = re.compile(r'for\s+(\w+)')
+
+# Function-name heuristics for _handle_def: the constant bodies live in
+# one dict keyed by the hint keyword, and a single precompiled scan of
+# the lowered name replaces one substring test per branch
+_NAME_HINT_BODIES = {
+    "prime": ("""    if n < 2:
+        return False
+    for i in range(2, int(n ** 0.5) + 1):
+        if n % i == 0:
+            return False
+    return True""", "Prime number check implementation"),
+    "palindrome": ("""    s = ''.join(c.lower() for c in s if c.isalnum())
+    return s == s[::-1]""", "Palindrome check implementation"),
+    "factorial": ("""    if n == 0 or n == 1:
+        return 1
+    return n * factorial(n - 1)""", "Factorial implementation"),
+    "fibonacci": ("""    if n <= 1:
+        return n
+    return fibonacci(n-1) + fibonacci(n-2)""", "Fibonacci implementation"),
+}
+_NAME_HINT_BODIES["fib"] = _NAME_HINT_BODIES["fibonacci"]
+_NAME_HINT_RE = re.compile("|".join(sorted(_NAME_HINT_BODIES, key=len, reverse=True)))
+
 class SmartCodeCompletion:
     """Advanced code completion using pattern analysis and AST parsing"""
     
     def __init__(self):
         self.code_patterns = self._load_all_patterns()
-        
+        # Every lowered trigger goes into one longest-first alternation,
+        # so matching is a single scan of the buffer instead of a
+        # substring search per trigger per pattern. Hits map back to the
+        # first pattern that declared the trigger.
+        self._trigger_patterns: Dict[str, str] = {}
+        rows = []
+        for name, pattern in self.code_patterns.items():
+            # Lower triggers and keywords once here; the scan loops used
+            # to re-lower every one of them per keystroke. The first line
+            # of the completion gates the already-inserted test.
+            triggers_lower = tuple(t.lower() for t in pattern["triggers"])
+            row = _PatternRow(
+                name=name,
+                triggers_lower=triggers_lower,
+                # Word-level trigger matching is one frozenset
+                # intersection per row instead of a substring test per
+                # word per trigger
+                trigger_words=frozenset(
+                    word for trigger in triggers_lower for word in trigger.split()
+                ),
+                keywords_lower=tuple(k.lower() for k in pattern.get("context_keywords", [])),
+                code=pattern["code"],
+                first_line=pattern["code"].split("\n", 1)[0],
+            )
+            rows.append(row)
+            for trigger in row.triggers_lower:
+                self._trigger_patterns.setdefault(trigger, name)
+        self._pattern_rows = tuple(rows)
+        self._trigger_scan = re.compile(
+            "|".join(sorted(map(re.escape, self._trigger_patterns), key=len, reverse=True))
+        )
+        # Same single-scan treatment for context keywords: one pass over
+        # the query finds every keyword, and hits map back to the
+        # patterns that declared them, instead of a substring test per
+        # keyword per pattern in get_all_suggestions
+        self._keyword_patterns: Dict[str, Tuple[str, ...]] = {}
+        keyword_owners: Dict[str, List[str]] = {}
+        for row in rows:
+            for keyword in row.keywords_lower:
+                keyword_owners.setdefault(keyword, []).append(row.name)
+        self._keyword_patterns = {k: tuple(v) for k, v in keyword_owners.items()}
+        self._keyword_scan = re.compile(
+            "|".join(sorted(map(re.escape, self._keyword_patterns), key=len, reverse=True))
+        )
+        # The empty-buffer dropdown shows the same popular patterns every
+        # time; build those suggestion dicts once instead of per query
+        popular = ("is_prime", "is_palindrome", "fibonacci_recursive",
+                   "factorial", "binary_search", "bubble_sort")
+        self._starter_suggestions = tuple(
+            {
+                "name": name.replace("_", " ").title(),
+                "code": self.code_patterns[name]["code"],
+                "description": f"Implement {name.replace('_', ' ')}"
+            }
+            for name in popular if name in self.code_patterns
+        )
+
     def _load_all_patterns(self) -> Dict:
         """Load comprehensive code patterns for intelligent completion"""
         return {
@@ -36,7 +147,16 @@ class SmartCodeCompletion:
             "fibonacci_recursive": {
                 "triggers": ["def fibonacci", "fib", "fibonacci sequence"],
                 "context_keywords": ["fibonacci", "fib", "sequence"],
-                "code": """def fibonacci(n):
+                # The memoized version is what gets inserted; the bare
+                # recursion is exponential and kept only as "alt"
+                "code": """from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def fibonacci(n):
+    if n <= 1:
+        return n
+    return fibonacci(n-1) + fibonacci(n-2)""",
+                "alt": """def fibonacci(n):
     if n <= 1:
         return n
     return fibonacci(n-1) + fibonacci(n-2)"""
@@ -264,9 +384,11 @@ def gcd(a, b):
                 "context_keywords": ["flatten", "nested", "list"],
                 "code": """def flatten_list(nested_list):
     result = []
-    for item in nested_list:
+    stack = list(reversed(nested_list))
+    while stack:
+        item = stack.pop()
         if isinstance(item, list):
-            result.extend(flatten_list(item))
+            stack.extend(reversed(item))
         else:
             result.append(item)
     return result"""
@@ -320,23 +442,57 @@ except Exception as e:
         """Analyze code and predict next lines intelligently"""
         if not code.strip():
             return self._get_starter_suggestion()
-        
+
+        key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+        if key in _predict_cache:
+            _predict_cache.move_to_end(key)
+            return _predict_cache[key]
+
+        result = self._compute_prediction(code, key)
+        _predict_cache[key] = result
+        if len(_predict_cache) > _PREDICT_CACHE_MAX:
+            _predict_cache.popitem(last=False)
+        return result
+
+    def _compute_prediction(self, code: str, key: Optional[bytes] = None) -> Optional[Dict]:
+        """Uncached prediction; analyze_and_predict memoizes this
+
+        key is the buffer digest already computed by the caller; it is
+        threaded down to the Jedi cache so the buffer is hashed once
+        per call rather than once per layer.
+        """
         lines = code.split('\n')
         last_line = lines[-1].strip() if lines else ""
+
+        # A keystroke that left the current line without letters (colon,
+        # brackets, whitespace) cannot have completed a trigger; go
+        # straight to line prediction and Jedi. Bounded scan - sixteen
+        # characters decide.
+        if not any(c.isalpha() for c in last_line[:16]):
+            return self._predict_next_line(lines) or self._get_jedi_completion(code, key)
+
         code_lower = code.lower()
-        
-        # Check for exact pattern matches
-        for pattern_name, pattern in self.code_patterns.items():
-            for trigger in pattern["triggers"]:
-                if trigger.lower() in last_line.lower() or trigger.lower() in code_lower:
-                    # Check if pattern not already in code
-                    if pattern["code"] not in code:
-                        return {
-                            "completion": pattern["code"],
-                            "type": "pattern",
-                            "confidence": 0.95,
-                            "description": f"Complete {pattern_name.replace('_', ' ')}"
-                        }
+
+        # One scan of the lowered buffer finds every trigger at once; the
+        # last line is part of the buffer, so the old separate last-line
+        # check is covered by the same pass. Pattern declaration order
+        # still decides priority among the matches.
+        matched = {
+            self._trigger_patterns[m.group(0)]
+            for m in self._trigger_scan.finditer(code_lower)
+        }
+        if matched:
+            for row in self._pattern_rows:
+                # Check if pattern not already in code; the full
+                # multi-line search only runs when the first line hits
+                if row.name in matched and (
+                        row.first_line not in code or row.code not in code):
+                    return {
+                        "completion": row.code,
+                        "type": "pattern",
+                        "confidence": 0.95,
+                        "description": f"Complete {row.name.replace('_', ' ')}"
+                    }
         
         # Context-aware next line prediction
         next_line = self._predict_next_line(lines)
@@ -344,7 +500,7 @@ except Exception as e:
             return next_line
         
         # Use Jedi for intelligent completions
-        jedi_completion = self._get_jedi_completion(code)
+        jedi_completion = self._get_jedi_completion(code, key)
         if jedi_completion:
             return jedi_completion
         
@@ -354,118 +510,126 @@ except Exception as e:
         """Predict the next line based on context"""
         if not lines:
             return None
-        
+
         last_line = lines[-1].strip()
-        
-        # Function definition - suggest docstring and body
-        if last_line.startswith("def ") and last_line.endswith(":"):
-            func_match = re.search(r'def\s+(\w+)\s*\((.*?)\)', last_line)
-            if func_match:
-                func_name = func_match.group(1)
-                params = func_match.group(2)
-                
-                # Smart suggestions based on function name
-                if "prime" in func_name.lower():
-                    return {
-                        "completion": """    if n < 2:
-        return False
-    for i in range(2, int(n ** 0.5) + 1):
-        if n % i == 0:
-            return False
-    return True""",
-                        "type": "next_line",
-                        "confidence": 0.9,
-                        "description": "Prime number check implementation"
-                    }
-                elif "palindrome" in func_name.lower():
-                    return {
-                        "completion": """    s = ''.join(c.lower() for c in s if c.isalnum())
-    return s == s[::-1]""",
-                        "type": "next_line",
-                        "confidence": 0.9,
-                        "description": "Palindrome check implementation"
-                    }
-                elif "factorial" in func_name.lower():
-                    return {
-                        "completion": """    if n == 0 or n == 1:
-        return 1
-    return n * factorial(n - 1)""",
-                        "type": "next_line",
-                        "confidence": 0.9,
-                        "description": "Factorial implementation"
-                    }
-                elif "fibonacci" in func_name.lower() or "fib" in func_name.lower():
-                    return {
-                        "completion": """    if n <= 1:
-        return n
-    return fibonacci(n-1) + fibonacci(n-2)""",
-                        "type": "next_line",
-                        "confidence": 0.9,
-                        "description": "Fibonacci implementation"
-                    }
-                elif "sum" in func_name.lower():
-                    return {
-                        "completion": f"""    \"\"\"Calculate sum\"\"\"\n    return sum({params.split(',')[0].strip() if params else 'values'})""",
-                        "type": "next_line",
-                        "confidence": 0.8,
-                        "description": "Sum calculation"
-                    }
-                else:
-                    return {
-                        "completion": f'    """TODO: Implement {func_name}"""\n    pass',
-                        "type": "next_line",
-                        "confidence": 0.7,
-                        "description": "Add function body"
-                    }
-        
-        # Class definition - suggest __init__
-        if last_line.startswith("class ") and last_line.endswith(":"):
-            class_name = re.search(r'class\s+(\w+)', last_line)
-            if class_name:
-                return {
-                    "completion": """    def __init__(self):
-        pass""",
-                    "type": "next_line",
-                    "confidence": 0.85,
-                    "description": "Add constructor"
-                }
-        
-        # For loop - suggest body
-        if last_line.startswith("for ") and last_line.endswith(":"):
-            var_match = re.search(r'for\s+(\w+)', last_line)
-            if var_match:
-                var = var_match.group(1)
-                return {
-                    "completion": f'    print({var})',
-                    "type": "next_line",
-                    "confidence": 0.75,
-                    "description": "Add loop body"
-                }
-        
-        # If statement - suggest body
-        if last_line.startswith("if ") and last_line.endswith(":"):
+
+        # Every form handled here is a block header, so one endswith
+        # guard plus a dict lookup on the first token replaces the old
+        # startswith chain
+        if not last_line.endswith(":"):
+            return None
+        head = last_line.split(None, 1)[0]
+        handler = self._LINE_HANDLERS.get(head)
+        return handler(self, last_line) if handler else None
+
+    def _handle_def(self, last_line: str) -> Optional[Dict]:
+        """Function definition - suggest docstring and body"""
+        func_match = _DEF_RE.search(last_line)
+        if not func_match:
+            return None
+        func_name = func_match.group(1)
+        params = func_match.group(2)
+        func_lower = func_name.lower()
+
+        # Smart suggestions based on function name
+        hint = _NAME_HINT_RE.search(func_lower)
+        if hint:
+            body, description = _NAME_HINT_BODIES[hint.group(0)]
             return {
-                "completion": '    pass',
+                "completion": body,
                 "type": "next_line",
-                "confidence": 0.7,
-                "description": "Add if body"
+                "confidence": 0.9,
+                "description": description
             }
-        
-        # While loop - suggest body
-        if last_line.startswith("while ") and last_line.endswith(":"):
+        elif "sum" in func_lower:
+            return {
+                "completion": f"""    \"\"\"Calculate sum\"\"\"\n    return sum({params.split(',')[0].strip() if params else 'values'})""",
+                "type": "next_line",
+                "confidence": 0.8,
+                "description": "Sum calculation"
+            }
+        else:
             return {
-                "completion": '    pass',
+                "completion": f'    """TODO: Implement {func_name}"""\n    pass',
                 "type": "next_line",
                 "confidence": 0.7,
-                "description": "Add while body"
+                "description": "Add function body"
             }
-        
-        return None
-    
-    def _get_jedi_completion(self, code: str) -> Optional[Dict]:
+
+    def _handle_class(self, last_line: str) -> Optional[Dict]:
+        """Class definition - suggest __init__"""
+        if not _CLASS_RE.search(last_line):
+            return None
+        return {
+            "completion": """    def __init__(self):
+        pass""",
+            "type": "next_line",
+            "confidence": 0.85,
+            "description": "Add constructor"
+        }
+
+    def _handle_for(self, last_line: str) -> Optional[Dict]:
+        """For loop - suggest body"""
+        var_match = _FOR_RE.search(last_line)
+        if not var_match:
+            return None
+        var = var_match.group(1)
+        return {
+            "completion": f'    print({var})',
+            "type": "next_line",
+            "confidence": 0.75,
+            "description": "Add loop body"
+        }
+
+    def _handle_if(self, last_line: str) -> Optional[Dict]:
+        """If statement - suggest body"""
+        return {
+            "completion": '    pass',
+            "type": "next_line",
+            "confidence": 0.7,
+            "description": "Add if body"
+        }
+
+    def _handle_while(self, last_line: str) -> Optional[Dict]:
+        """While loop - suggest body"""
+        return {
+            "completion": '    pass',
+            "type": "next_line",
+            "confidence": 0.7,
+            "description": "Add while body"
+        }
+
+    # First token of a block header mapped to its handler
+    _LINE_HANDLERS = {
+        "def": _handle_def,
+        "class": _handle_class,
+        "for": _handle_for,
+        "if": _handle_if,
+        "while": _handle_while,
+    }
+
+    def _get_jedi_completion(self, code: str, key: Optional[bytes] = None) -> Optional[Dict]:
         """Use Jedi for intelligent Python completions"""
+        if key is None:
+            key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+        if key in _jedi_cache:
+            _jedi_cache.move_to_end(key)
+            return _jedi_cache[key]
+
+        result = self._compute_jedi_completion(code)
+        _jedi_cache[key] = result
+        if len(_jedi_cache) > _JEDI_CACHE_MAX:
+            _jedi_cache.popitem(last=False)
+        return result
+
+    def _compute_jedi_completion(self, code: str) -> Optional[Dict]:
+        """Uncached Jedi lookup; _get_jedi_completion memoizes this"""
+        # Jedi startup is not worth paying on tiny buffers
+        if len(code) < 20:
+            return None
+
         try:
-            script = jedi.Script(code=code)
+            script = jedi.Script(code=code, project=_JEDI_PROJECT)
             completions = script.complete()  # type: ignore
             
             if completions:
@@ -500,43 +664,41 @@ print(greet("World"))""",
         partial_lower = partial_code.lower().strip()
         
         if not partial_lower:
-            # Show popular patterns
-            popular = ["is_prime", "is_palindrome", "fibonacci_recursive", 
-                      "factorial", "binary_search", "bubble_sort"]
-            for pattern_name in popular:
-                if pattern_name in self.code_patterns:
-                    pattern = self.code_patterns[pattern_name]
-                    suggestions.append({
-                        "name": pattern_name.replace("_", " ").title(),
-                        "code": pattern["code"],
-                        "description": f"Implement {pattern_name.replace('_', ' ')}"
-                    })
-            return suggestions
+            # Show popular patterns, prebuilt at load
+            return list(self._starter_suggestions)
         
-        # Find matching patterns
-        for pattern_name, pattern in self.code_patterns.items():
+        # Find matching patterns. One scan of the query resolves the
+        # keyword tier for every pattern at once.
+        partial_words = frozenset(partial_lower.split())
+        kw_matched = {
+            name
+            for m in self._keyword_scan.finditer(partial_lower)
+            for name in self._keyword_patterns[m.group(0)]
+        }
+        for row in self._pattern_rows:
             match_score = 0
-            
+
             # Check triggers
-            for trigger in pattern["triggers"]:
-                if partial_lower in trigger.lower():
-                    match_score = max(match_score, 0.9)
-                elif any(word in trigger.lower() for word in partial_lower.split()):
-                    match_score = max(match_score, 0.7)
-            
+            for trigger in row.triggers_lower:
+                if partial_lower in trigger:
+                    match_score = 0.9
+                    break
+            else:
+                if partial_words & row.trigger_words:
+                    match_score = 0.7
+
             # Check context keywords
-            for keyword in pattern.get("context_keywords", []):
-                if keyword.lower() in partial_lower:
-                    match_score = max(match_score, 0.6)
+            if match_score < 0.6 and row.name in kw_matched:
+                match_score = 0.6
             
             if match_score > 0:
                 suggestions.append({
-                    "name": pattern_name.replace("_", " ").title(),
-                    "code": pattern["code"],
-                    "description": f"Implement {pattern_name.replace('_', ' ')}",
+                    "name": row.name.replace("_", " ").title(),
+                    "code": row.code,
+                    "description": f"Implement {row.name.replace('_', ' ')}",
                     "score": match_score
                 })
         
-        # Sort by score
-        suggestions.sort(key=lambda x: x.get("score", 0), reverse=True)
-        return suggestions[:10]
+        # Only the top 10 are shown, so a bounded heap selection beats
+        # sorting the whole candidate list; every entry carries "score"
+        return heapq.nlargest(10, suggestions, key=itemgetter("score"))
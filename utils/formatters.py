@@ -1,14 +1,65 @@
+import hashlib
 import subprocess
 import tempfile
 import os
+from collections import OrderedDict
 from typing import Optional
 
+# In-process autopep8 skips a fork/exec and a full interpreter start per
+# format; the subprocess path stays as the fallback when it is missing
+try:
+    import autopep8
+except ImportError:
+    autopep8 = None
+
+# Formatted output is memoized by content digest - format clicks repeat
+# on unchanged buffers, and the external tools cost tens of ms per run.
+# person= folds the language into the key without string concat.
+_FORMAT_CACHE_MAX = 128
+_format_cache: "OrderedDict[bytes, Optional[str]]" = OrderedDict()
+
+
+def _cached_format(language: bytes, code: str, compute) -> Optional[str]:
+    key = hashlib.blake2b(code.encode(), digest_size=16, person=language).digest()
+    if key in _format_cache:
+        _format_cache.move_to_end(key)
+        return _format_cache[key]
+
+    result = compute(code)
+    _format_cache[key] = result
+    if len(_format_cache) > _FORMAT_CACHE_MAX:
+        _format_cache.popitem(last=False)
+    return result
+
+# Block-structure keywords for the fallback formatter, built once
+# instead of per line; 'except' also covers 'except:'. Indent prefixes
+# are preallocated so the loop never re-multiplies '    ' per line.
+_DEDENT_STARTS = ('else:', 'elif ', 'except', 'finally:')
+_BLOCK_STARTS = ('def ', 'class ', 'if ', 'for ', 'while ', 'try:', 'with ') + _DEDENT_STARTS
+_EXIT_STATEMENTS = ('pass', 'break', 'continue', 'return')
+_INDENTS = tuple('    ' * i for i in range(64))
+# Same preallocation for the brace formatter's two indent widths
+_BRACE_INDENTS = {
+    '  ': tuple('  ' * i for i in range(64)),
+    '    ': _INDENTS,
+}
+
 class CodeFormatter:
     """Code formatting utilities for different languages"""
     
     @staticmethod
     def format_python(code: str) -> Optional[str]:
         """Format Python code using Black"""
+        return _cached_format(b'python', code, CodeFormatter._format_python_uncached)
+
+    @staticmethod
+    def _format_python_uncached(code: str) -> Optional[str]:
+        if autopep8 is not None:
+            try:
+                return autopep8.fix_code(code, options={'aggressive': 2})
+            except Exception:
+                return CodeFormatter._basic_python_format(code)
+
         try:
             # Try autopep8 first (more lenient)
             result = subprocess.run(
@@ -42,21 +93,22 @@ class CodeFormatter:
                 continue
             
             # Adjust indent level before adding line
-            if stripped.startswith(('else:', 'elif ', 'except', 'except:', 'finally:')):
+            if stripped.startswith(_DEDENT_STARTS):
                 current_indent = max(0, indent_level - 1)
-            elif stripped.startswith(('def ', 'class ', 'if ', 'for ', 'while ', 'try:', 'with ')):
-                current_indent = indent_level
             else:
                 current_indent = indent_level
-            
+
             # Add formatted line
-            formatted_lines.append('    ' * current_indent + stripped)
-            
+            if current_indent < len(_INDENTS):
+                formatted_lines.append(_INDENTS[current_indent] + stripped)
+            else:
+                formatted_lines.append('    ' * current_indent + stripped)
+
             # Adjust indent level after adding line
             if stripped.endswith(':') and not stripped.startswith('#'):
-                if any(stripped.startswith(kw) for kw in ['def ', 'class ', 'if ', 'for ', 'while ', 'try:', 'with ', 'else:', 'elif ', 'except', 'finally:']):
+                if stripped.startswith(_BLOCK_STARTS):
                     indent_level += 1
-            elif stripped in ['pass', 'break', 'continue', 'return'] or (stripped.startswith('return ') and stripped != 'return'):
+            elif stripped in _EXIT_STATEMENTS or stripped.startswith('return '):
                 if indent_level > 0:
                     indent_level -= 1
         
@@ -65,6 +117,10 @@ class CodeFormatter:
     @staticmethod
     def format_javascript(code: str) -> Optional[str]:
         """Format JavaScript code using Prettier (if available)"""
+        return _cached_format(b'javascript', code, CodeFormatter._format_javascript_uncached)
+
+    @staticmethod
+    def _format_javascript_uncached(code: str) -> Optional[str]:
         try:
             # Try prettier if available
             result = subprocess.run(
@@ -85,68 +141,63 @@ class CodeFormatter:
         return CodeFormatter._basic_javascript_format(code)
     
     @staticmethod
-    def _basic_javascript_format(code: str) -> str:
-        """Basic JavaScript formatting"""
+    def _basic_brace_format(code: str, indent: str = '    ', keep_preprocessor: bool = False) -> str:
+        """Shared fallback formatter for brace-delimited languages
+
+        The JS/Java/C++ fallbacks were three near-identical loops
+        differing only in indent width and the C++ preprocessor
+        passthrough; one body keeps the fix surface small.
+        """
         lines = code.split('\n')
         formatted_lines = []
         indent_level = 0
-        
+        prefixes = _BRACE_INDENTS.get(indent)
+
         for line in lines:
             stripped = line.strip()
             if not stripped:
                 formatted_lines.append('')
                 continue
-            
+
+            # Handle preprocessor directives
+            if keep_preprocessor and stripped.startswith('#'):
+                formatted_lines.append(stripped)
+                continue
+
             # Decrease indent for closing braces
             if stripped.startswith('}'):
                 indent_level = max(0, indent_level - 1)
-            
+
             # Add formatted line
-            formatted_lines.append('  ' * indent_level + stripped)
-            
+            if prefixes is not None and indent_level < len(prefixes):
+                formatted_lines.append(prefixes[indent_level] + stripped)
+            else:
+                formatted_lines.append(indent * indent_level + stripped)
+
             # Increase indent after opening braces
             if stripped.endswith('{'):
                 indent_level += 1
-            elif stripped.startswith('}') and stripped.endswith('{'):
-                indent_level += 1
-        
+
         return '\n'.join(formatted_lines)
-    
+
+    @staticmethod
+    def _basic_javascript_format(code: str) -> str:
+        """Basic JavaScript formatting"""
+        return CodeFormatter._basic_brace_format(code, indent='  ')
+
     @staticmethod
     def format_java(code: str) -> Optional[str]:
         """Format Java code"""
         # Basic Java formatting (similar to JavaScript but with different conventions)
-        return CodeFormatter._basic_java_format(code)
-    
-    @staticmethod
-    def _basic_java_format(code: str) -> str:
-        """Basic Java formatting"""
-        lines = code.split('\n')
-        formatted_lines = []
-        indent_level = 0
-        
-        for line in lines:
-            stripped = line.strip()
-            if not stripped:
-                formatted_lines.append('')
-                continue
-            
-            # Decrease indent for closing braces
-            if stripped.startswith('}'):
-                indent_level = max(0, indent_level - 1)
-            
-            # Add formatted line
-            formatted_lines.append('    ' * indent_level + stripped)
-            
-            # Increase indent after opening braces
-            if stripped.endswith('{'):
-                indent_level += 1
-        
-        return '\n'.join(formatted_lines)
-    
+        return _cached_format(b'java', code, CodeFormatter._basic_brace_format)
+
     @staticmethod
     def format_cpp(code: str) -> Optional[str]:
         """Format C++ code using clang-format (if available)"""
+        return _cached_format(b'cpp', code, CodeFormatter._format_cpp_uncached)
+
+    @staticmethod
+    def _format_cpp_uncached(code: str) -> Optional[str]:
         try:
             result = subprocess.run(
                 ['clang-format', '--style=Google'],
@@ -168,33 +219,7 @@ class CodeFormatter:
     @staticmethod
     def _basic_cpp_format(code: str) -> str:
         """Basic C++ formatting"""
-        lines = code.split('\n')
-        formatted_lines = []
-        indent_level = 0
-        
-        for line in lines:
-            stripped = line.strip()
-            if not stripped:
-                formatted_lines.append('')
-                continue
-            
-            # Handle preprocessor directives
-            if stripped.startswith('#'):
-                formatted_lines.append(stripped)
-                continue
-            
-            # Decrease indent for closing braces
-            if stripped.startswith('}'):
-                indent_level = max(0, indent_level - 1)
-            
-            # Add formatted line
-            formatted_lines.append('    ' * indent_level + stripped)
-            
-            # Increase indent after opening braces
-            if stripped.endswith('{'):
-                indent_level += 1
-        
-        return '\n'.join(formatted_lines)
+        return CodeFormatter._basic_brace_format(code, keep_preprocessor=True)
 
 def format_code(code: str, language: str) -> Optional[str]:
     """Format code for the specified language"""
@@ -1,115 +1,243 @@
+import ast
+import hashlib
 import re
 import os
+from collections import OrderedDict
 from typing import List, Set
 
+# Safety decisions are memoized by content digest - the executor asks
+# about the same buffer on every rerun, and the answer only depends on
+# (language, code). person= folds the language into the key.
+_SAFE_CACHE_MAX = 512
+_safe_cache: "OrderedDict[bytes, bool]" = OrderedDict()
+_VIOLATION_CACHE_MAX = 128
+_violation_cache: "OrderedDict[bytes, List[str]]" = OrderedDict()
+
+# Dangerous patterns that should be blocked. Sources live here and each
+# is compiled once at import; the check methods used to push every one
+# of them back through re's internal cache per call.
+_DANGEROUS_PATTERN_SOURCES = {
+    "python": [
+        r'\beval\s*\(',
+        r'\bexec\s*\(',
+        r'\b__import__\s*\(',
+        r'\bgetattr\s*\(',
+        r'\bsetattr\s*\(',
+        r'\bdelattr\s*\(',
+        r'\bglobals\s*\(',
+        r'\blocals\s*\(',
+        r'\bvars\s*\(',
+        r'\bdir\s*\(',
+        r'\bopen\s*\(',
+        r'subprocess\.',
+        r'os\.',
+        r'sys\.',
+        r'\bfile\s*\(',
+        r'\binput\s*\(',
+        r'\braw_input\s*\(',
+        r'import\s+os',
+        r'import\s+sys',
+        r'import\s+subprocess',
+        r'from\s+os\s+import',
+        r'from\s+sys\s+import',
+        r'from\s+subprocess\s+import',
+    ],
+    "javascript": [
+        r'\beval\s*\(',
+        r'Function\s*\(',
+        r'setTimeout\s*\(',
+        r'setInterval\s*\(',
+        r'document\.write\s*\(',
+        r'innerHTML\s*=',
+        r'outerHTML\s*=',
+        r'location\.',
+        r'window\.',
+        r'XMLHttpRequest',
+        r'fetch\s*\(',
+        r'require\s*\(',
+    ],
+    "java": [
+        r'Runtime\.getRuntime\s*\(\)',
+        r'ProcessBuilder',
+        r'System\.exit\s*\(',
+        r'Class\.forName\s*\(',
+        r'Method\.invoke\s*\(',
+        r'java\.io\.File',
+        r'java\.nio\.file',
+        r'java\.lang\.reflect',
+        r'java\.net\.URL',
+        r'java\.net\.Socket',
+    ],
+    "cpp": [
+        r'system\s*\(',
+        r'exec\s*\(',
+        r'popen\s*\(',
+        r'#include\s*<cstdlib>',
+        r'#include\s*<unistd\.h>',
+        r'#include\s*<sys/',
+        r'malloc\s*\(',
+        r'free\s*\(',
+        r'delete\s+',
+        r'new\s+\w+\[',
+    ]
+}
+
+# Lowercase literal cores of the patterns above: if none of these
+# appear as a substring, no pattern can match and the regex pass is
+# skipped, which is the common case for safe code. Every pattern in
+# _DANGEROUS_PATTERN_SOURCES must keep a covering literal here.
+_LITERAL_PREFILTER = {
+    "python": (
+        'eval', 'exec', '__import__', 'getattr', 'setattr', 'delattr',
+        'globals', 'locals', 'vars', 'dir', 'open', 'subprocess',
+        'os.', 'sys.', 'file', 'input', 'import',
+    ),
+    "javascript": (
+        'eval', 'function', 'settimeout', 'setinterval', 'document',
+        'innerhtml', 'outerhtml', 'location.', 'window.',
+        'xmlhttprequest', 'fetch', 'require',
+    ),
+    "java": (
+        'runtime.', 'processbuilder', 'system.exit', 'class.forname',
+        'method.invoke', 'java.',
+    ),
+    "cpp": (
+        'system', 'exec', 'popen', 'cstdlib', 'unistd', 'sys/',
+        'malloc', 'free', 'delete', 'new',
+    ),
+}
+
+# One alternation per language so a safety check is a single pass over
+# the buffer instead of one full scan per pattern. Group p<i> maps a hit
+# back to sources[i] for violation messages; none of the sources use
+# backreferences, so fusing them is safe.
+# python, javascript and java are case-sensitive languages - EVAL( is
+# not a call to eval there - so only cpp keeps case folding, and the
+# engine tracks half the states for the rest
+_PATTERN_FLAGS = {
+    "python": re.MULTILINE,
+    "javascript": re.MULTILINE,
+    "java": re.MULTILINE,
+    "cpp": re.IGNORECASE | re.MULTILINE,
+}
+
+_FUSED_DANGEROUS = {
+    language: re.compile(
+        "|".join(f"(?P<p{i}>{source})" for i, source in enumerate(sources)),
+        _PATTERN_FLAGS.get(language, re.MULTILINE),
+    )
+    for language, sources in _DANGEROUS_PATTERN_SOURCES.items()
+}
+
+# Helper regexes for the language-specific checks and output
+# sanitization, compiled once for the same reason
+_INCLUDE_RE = re.compile(r'#include\s*[<"]([^>"]+)[>"]')
+# One fused pattern per language for the specific checks; the dunder
+# arm bounds what used to be a greedy .* so it cannot backtrack across
+# the line
+_PY_ATTR_RE = re.compile(r'\.(?:__[^.\s]*__|func_code|gi_code|cr_code)')
+_PY_BUILTINS_RE = re.compile(r'\b(compile|eval|exec|globals|locals|vars)\s*\(')
+_BAD_BUILTINS = frozenset({'compile', 'eval', 'exec', 'globals', 'locals', 'vars'})
+
+# Module sets for the import checks, built once instead of per call
+_ALLOWED_PY_IMPLICIT = frozenset({'builtins', '', 'typing', 'dataclasses', 'enum'})
+_DANGEROUS_PY_MODULES = frozenset({
+    'os', 'sys', 'subprocess', 'importlib', '__builtin__',
+    'ctypes', 'marshal', 'pickle', 'shelve', 'socket',
+    'urllib2', 'httplib', 'ftplib', 'telnetlib', 'smtplib'
+})
+_DANGEROUS_CPP_INCLUDES = frozenset({
+    'cstdlib', 'unistd.h', 'sys/', 'windows.h', 'winbase.h'
+})
+_EMPTY_FROZENSET = frozenset()
+
+# Allowed standard library functions
+_ALLOWED_IMPORTS = {
+    "python": frozenset({
+        'math', 'random', 'datetime', 'json', 'urllib', 'hashlib',
+        'base64', 'itertools', 'functools', 'collections', 'typing',
+        'dataclasses', 'enum', 'decimal', 'fractions'
+    }),
+    "javascript": frozenset({
+        'Math', 'Date', 'JSON', 'Array', 'Object', 'String', 'Number', 'Boolean'
+    })
+}
+_JS_UNSAFE_RE = re.compile(r'\.(?:prototype\s*[=\[]|constructor)')
+_JAVA_UNSAFE_RE = re.compile(r'\.getClass\s*\(\)|\bnative\s+')
+_CPP_UNSAFE_RE = re.compile(r'\*\s*\(\s*\w+\s*\+|(?i:asm\s*\()')
+# Possessive quantifiers keep the redaction scan linear on adversarial
+# output; the IP lookarounds replace \b, which sat ambiguously between
+# digits and word characters. One alternation redacts paths and IPs in
+# a single pass; the callback picks the marker by matched group.
+_REDACT_RE = re.compile(
+    r'(?P<path>/[/\w.\-]++|[A-Za-z]:\\[\\w.\-]++)'
+    r'|(?P<ip>(?<!\d)(?:\d{1,3}\.){3}\d{1,3}(?!\d))'
+)
+
+
+def _redact(match: "re.Match[str]") -> str:
+    return '[IP_REMOVED]' if match.lastgroup == 'ip' else '[PATH_REMOVED]'
+
 class SecurityManager:
     """Manager for code execution security policies"""
-    
-    def __init__(self):
-        # Dangerous patterns that should be blocked
-        self.dangerous_patterns = {
-            "python": [
-                r'\beval\s*\(',
-                r'\bexec\s*\(',
-                r'\b__import__\s*\(',
-                r'\bgetattr\s*\(',
-                r'\bsetattr\s*\(',
-                r'\bdelattr\s*\(',
-                r'\bglobals\s*\(',
-                r'\blocals\s*\(',
-                r'\bvars\s*\(',
-                r'\bdir\s*\(',
-                r'\bopen\s*\(',
-                r'subprocess\.',
-                r'os\.',
-                r'sys\.',
-                r'\bfile\s*\(',
-                r'\binput\s*\(',
-                r'\braw_input\s*\(',
-                r'import\s+os',
-                r'import\s+sys',
-                r'import\s+subprocess',
-                r'from\s+os\s+import',
-                r'from\s+sys\s+import',
-                r'from\s+subprocess\s+import',
-            ],
-            "javascript": [
-                r'\beval\s*\(',
-                r'Function\s*\(',
-                r'setTimeout\s*\(',
-                r'setInterval\s*\(',
-                r'document\.write\s*\(',
-                r'innerHTML\s*=',
-                r'outerHTML\s*=',
-                r'location\.',
-                r'window\.',
-                r'XMLHttpRequest',
-                r'fetch\s*\(',
-                r'require\s*\(',
-            ],
-            "java": [
-                r'Runtime\.getRuntime\s*\(\)',
-                r'ProcessBuilder',
-                r'System\.exit\s*\(',
-                r'Class\.forName\s*\(',
-                r'Method\.invoke\s*\(',
-                r'java\.io\.File',
-                r'java\.nio\.file',
-                r'java\.lang\.reflect',
-                r'java\.net\.URL',
-                r'java\.net\.Socket',
-            ],
-            "cpp": [
-                r'system\s*\(',
-                r'exec\s*\(',
-                r'popen\s*\(',
-                r'#include\s*<cstdlib>',
-                r'#include\s*<unistd\.h>',
-                r'#include\s*<sys/',
-                r'malloc\s*\(',
-                r'free\s*\(',
-                r'delete\s+',
-                r'new\s+\w+\[',
-            ]
-        }
-        
-        # Allowed standard library functions
-        self.allowed_imports = {
-            "python": {
-                'math', 'random', 'datetime', 'json', 'urllib', 'hashlib',
-                'base64', 'itertools', 'functools', 'collections', 'typing',
-                'dataclasses', 'enum', 'decimal', 'fractions'
-            },
-            "javascript": {
-                'Math', 'Date', 'JSON', 'Array', 'Object', 'String', 'Number', 'Boolean'
-            }
-        }
-    
+
+    # Instances carry no state of their own - the policy tables are
+    # shared class attributes and construction is free
+    __slots__ = ()
+
+    dangerous_patterns = _DANGEROUS_PATTERN_SOURCES
+    allowed_imports = _ALLOWED_IMPORTS
+
+
     def is_code_safe(self, code: str, language: str) -> bool:
         """Check if code is safe to execute"""
+        key = hashlib.blake2b(
+            code.encode(), digest_size=16, person=language.encode()[:16]
+        ).digest()
+        if key in _safe_cache:
+            _safe_cache.move_to_end(key)
+            return _safe_cache[key]
+
+        result = self._compute_code_safe(code, language)
+        _safe_cache[key] = result
+        if len(_safe_cache) > _SAFE_CACHE_MAX:
+            _safe_cache.popitem(last=False)
+        return result
+
+    def _compute_code_safe(self, code: str, language: str) -> bool:
+        """Uncached safety check; is_code_safe memoizes this"""
         try:
+            # Check code length first - the comparison is free and an
+            # oversized payload should never reach the scanners
+            if len(code) > 10000:  # 10KB limit
+                return False
+
             # Check for dangerous patterns
             if self._contains_dangerous_patterns(code, language):
                 return False
-            
+
+            # Parse python once here; the AST answers the import and
+            # builtin questions without false positives on strings and
+            # comments. Unparseable code falls back to the regex paths.
+            tree = None
+            if language == "python":
+                try:
+                    tree = ast.parse(code)
+                except SyntaxError:
+                    tree = None
+
             # Check imports/includes
-            if not self._are_imports_safe(code, language):
-                return False
-            
-            # Check code length (prevent extremely long code)
-            if len(code) > 10000:  # 10KB limit
+            if not self._are_imports_safe(code, language, tree):
                 return False
-            
-            # Language-specific checks
+
+            # Language-specific checks; python is special-cased for the
+            # tree, the rest dispatch through the class-level table
             if language == "python":
-                return self._is_python_safe(code)
-            elif language == "javascript":
-                return self._is_javascript_safe(code)
-            elif language == "java":
-                return self._is_java_safe(code)
-            elif language == "cpp":
-                return self._is_cpp_safe(code)
-            
+                return self._is_python_safe(code, tree)
+            checker = self._LANGUAGE_CHECKS.get(language)
+            if checker is not None:
+                return checker(self, code)
+
             return True
             
         except Exception:
@@ -118,131 +246,165 @@ class SecurityManager:
     
     def _contains_dangerous_patterns(self, code: str, language: str) -> bool:
         """Check if code contains dangerous patterns"""
-        patterns = self.dangerous_patterns.get(language, [])
-        
-        for pattern in patterns:
-            if re.search(pattern, code, re.IGNORECASE | re.MULTILINE):
-                return True
-        
-        return False
+        fused = _FUSED_DANGEROUS.get(language)
+        if fused is None:
+            return False
+        # str.__contains__ is far cheaper than the regex engine; bail
+        # out when no literal core is present at all
+        tokens = _LITERAL_PREFILTER.get(language)
+        if tokens is not None:
+            code_lower = code.lower()
+            if not any(token in code_lower for token in tokens):
+                return False
+        return fused.search(code) is not None
     
-    def _are_imports_safe(self, code: str, language: str) -> bool:
+    def _are_imports_safe(self, code: str, language: str, tree=None) -> bool:
         """Check if imports/includes are safe"""
         if language == "python":
-            # Extract import statements
-            import_matches = re.findall(r'^(?:from\s+(\w+(?:\.\w+)*)\s+)?import\s+(.+)$', code, re.MULTILINE)
-            
-            for module, items in import_matches:
-                base_module = (module or items.split('.')[0]).split('.')[0]
-                allowed = self.allowed_imports.get(language, set())
-                
-                if base_module not in allowed and base_module not in {
-                    'builtins', '', 'typing', 'dataclasses', 'enum'
-                }:
-                    # Check if it's a dangerous module
-                    dangerous_modules = {
-                        'os', 'sys', 'subprocess', 'importlib', '__builtin__',
-                        'ctypes', 'marshal', 'pickle', 'shelve', 'socket',
-                        'urllib2', 'httplib', 'ftplib', 'telnetlib', 'smtplib'
-                    }
-                    
-                    if base_module in dangerous_modules:
-                        return False
-        
+            if tree is not None:
+                # Walk the real import nodes; this also sees indented
+                # imports the line regex misses
+                for node in ast.walk(tree):
+                    if isinstance(node, ast.Import):
+                        modules = [alias.name for alias in node.names]
+                    elif isinstance(node, ast.ImportFrom):
+                        modules = [node.module or '']
+                    else:
+                        continue
+                    for module in modules:
+                        if not self._is_import_allowed(module.split('.')[0]):
+                            return False
+                return True
+
+            # Fallback for unparseable code: a plain line scan beats the
+            # anchored multiline regex, and splitting on ',' first means
+            # 'import os, sys' resolves to 'os' instead of the whole list
+            for line in code.splitlines():
+                line = line.lstrip()
+                if line.startswith('import '):
+                    head = line.split(None, 2)[1]
+                    base_module = head.split(',')[0].split('.')[0]
+                elif line.startswith('from '):
+                    parts = line.split(None, 2)
+                    base_module = parts[1].split('.')[0] if len(parts) > 1 else ''
+                else:
+                    continue
+                if not self._is_import_allowed(base_module):
+                    return False
+
         elif language == "cpp":
             # Check for dangerous includes
-            dangerous_includes = {
-                'cstdlib', 'unistd.h', 'sys/', 'windows.h', 'winbase.h'
-            }
-            
-            includes = re.findall(r'#include\s*[<"]([^>"]+)[>"]', code)
+            includes = _INCLUDE_RE.findall(code)
             for include in includes:
-                if any(dangerous in include for dangerous in dangerous_includes):
+                if any(dangerous in include for dangerous in _DANGEROUS_CPP_INCLUDES):
                     return False
         
         return True
     
-    def _is_python_safe(self, code: str) -> bool:
+    def _is_import_allowed(self, base_module: str) -> bool:
+        """Whether a top-level python module may be imported"""
+        allowed = self.allowed_imports.get("python", _EMPTY_FROZENSET)
+        if base_module in allowed or base_module in _ALLOWED_PY_IMPLICIT:
+            return True
+        # Check if it's a dangerous module
+        return base_module not in _DANGEROUS_PY_MODULES
+
+    def _is_python_safe(self, code: str, tree=None) -> bool:
         """Python-specific safety checks"""
         # Check for attribute access on dangerous objects
-        dangerous_attrs = [
-            r'\.__.*__',  # Dunder methods
-            r'\.func_code',
-            r'\.gi_code',
-            r'\.cr_code',
-        ]
-        
-        for pattern in dangerous_attrs:
-            if re.search(pattern, code):
-                return False
-        
+        if _PY_ATTR_RE.search(code):
+            return False
+
         # Check for dangerous built-ins usage
-        if re.search(r'\b(compile|eval|exec|globals|locals|vars)\s*\(', code):
+        if tree is not None:
+            # A Call whose func is a bare Name is the only way to hit
+            # the real builtin; string and comment mentions don't parse
+            # into one
+            for node in ast.walk(tree):
+                if (isinstance(node, ast.Call)
+                        and isinstance(node.func, ast.Name)
+                        and node.func.id in _BAD_BUILTINS):
+                    return False
+            return True
+
+        if _PY_BUILTINS_RE.search(code):
             return False
-        
+
         return True
     
     def _is_javascript_safe(self, code: str) -> bool:
         """JavaScript-specific safety checks"""
-        # Check for prototype manipulation
-        if re.search(r'\.prototype\s*[=\[]', code):
-            return False
-        
-        # Check for constructor access
-        if re.search(r'\.constructor', code):
-            return False
-        
-        return True
+        # Check for prototype manipulation and constructor access
+        return not _JS_UNSAFE_RE.search(code)
     
     def _is_java_safe(self, code: str) -> bool:
         """Java-specific safety checks"""
-        # Check for reflection usage
-        if re.search(r'\.getClass\s*\(\)', code):
-            return False
-        
-        # Check for native method calls
-        if re.search(r'\bnative\s+', code):
-            return False
-        
-        return True
+        # Check for reflection usage and native method calls
+        return not _JAVA_UNSAFE_RE.search(code)
     
     def _is_cpp_safe(self, code: str) -> bool:
         """C++-specific safety checks"""
-        # Check for pointer arithmetic beyond basic usage
-        if re.search(r'\*\s*\(\s*\w+\s*\+', code):
-            return False
-        
-        # Check for inline assembly
-        if re.search(r'asm\s*\(', code, re.IGNORECASE):
-            return False
-        
-        return True
-    
+        # Check for pointer arithmetic beyond basic usage and inline
+        # assembly
+        return not _CPP_UNSAFE_RE.search(code)
+
+    # Language mapped to its specific check
+    _LANGUAGE_CHECKS = {
+        "javascript": _is_javascript_safe,
+        "java": _is_java_safe,
+        "cpp": _is_cpp_safe,
+    }
+
     def get_security_violations(self, code: str, language: str) -> List[str]:
         """Get list of security violations in code"""
+        key = hashlib.blake2b(
+            code.encode(), digest_size=16, person=language.encode()[:16]
+        ).digest()
+        if key in _violation_cache:
+            _violation_cache.move_to_end(key)
+            return list(_violation_cache[key])
+
+        violations = self._compute_violations(code, language)
+        _violation_cache[key] = violations
+        if len(_violation_cache) > _VIOLATION_CACHE_MAX:
+            _violation_cache.popitem(last=False)
+        return list(violations)
+
+    def _compute_violations(self, code: str, language: str) -> List[str]:
+        """Uncached violation scan; get_security_violations memoizes this"""
         violations = []
-        
-        patterns = self.dangerous_patterns.get(language, [])
-        for pattern in patterns:
-            if re.search(pattern, code, re.IGNORECASE | re.MULTILINE):
-                violations.append(f"Dangerous pattern detected: {pattern}")
-        
+
+        # Length first; an oversized buffer is only scanned up to the
+        # limit so the report still names the patterns in that prefix
         if len(code) > 10000:
             violations.append("Code too long (>10KB)")
-        
+            code = code[:10000]
+
+        # The boolean check is the cheap gate - literal prefilter plus a
+        # first-match search; the full group accounting below only runs
+        # when something actually matched
+        if self._contains_dangerous_patterns(code, language):
+            fused = _FUSED_DANGEROUS[language]
+            sources = _DANGEROUS_PATTERN_SOURCES[language]
+            hit_groups = {m.lastgroup for m in fused.finditer(code)}
+            for i, source in enumerate(sources):
+                if f"p{i}" in hit_groups:
+                    violations.append(f"Dangerous pattern detected: {source}")
+
         return violations
     
     def sanitize_output(self, output: str) -> str:
         """Sanitize execution output to remove potential sensitive information"""
-        # Remove file system paths
-        output = re.sub(r'/[/\w.-]+', '[PATH_REMOVED]', output)
-        output = re.sub(r'[A-Za-z]:\\[\\w.-]+', '[PATH_REMOVED]', output)
-        
-        # Remove IP addresses
-        output = re.sub(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', '[IP_REMOVED]', output)
-        
-        # Limit output length
-        if len(output) > 5000:
-            output = output[:5000] + "\n... [Output truncated for security]"
-        
+        # Truncate before redacting - everything past the limit is
+        # discarded anyway, so the regex passes only ever see 5000 chars
+        truncated = len(output) > 5000
+        if truncated:
+            output = output[:5000]
+
+        # Remove file system paths and IP addresses in one pass
+        output = _REDACT_RE.sub(_redact, output)
+
+        if truncated:
+            output += "\n... [Output truncated for security]"
+
         return output